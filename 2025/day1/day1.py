@@ -1,6 +1,25 @@
 #!/usr/bin/env python3
 import os
+import sys
+try:
+    from variants import HAVE_NUMPY, generator, variant
+except ImportError:
+    # HACK: we're being run directly instead of through run.py, so the shared tools two
+    #       directories up aren't importable yet.
+    sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    from variants import HAVE_NUMPY, generator, variant
+import itertools
 
+@generator(sizes=[1_000, 10_000, 100_000, 1_000_000])
+def generate_input(size, rng):
+    """size moves of up to 999 clicks each."""
+    return "\n".join(f"{rng.choice('LR')}{rng.randint(1, 999)}" for _ in range(size)) + "\n"
+
+def load_instructions(path):
+    with open(path, "rb") as fin:
+        return list(read_instructions(fin))
+
+@variant(1, load=load_instructions, solver=True)
 def part1(instructions):
     current_pos = 50
     zeros_seen = 0
@@ -15,6 +34,7 @@ def part1(instructions):
 
     return zeros_seen
 
+@variant(2, load=load_instructions, solver=True)
 def part2(instructions):
     current_pos = 50
     zeros_seen = 0
@@ -34,14 +54,331 @@ def part2(instructions):
 
     return zeros_seen
 
+def solve(instructions):
+    """
+    part1 and part2 fused into a single pass, so instructions can be any one-shot iterable
+    (e.g. read_instructions) and never has to be materialised.
+    """
+    current_pos = 50
+    landed = 0
+    passed = 0
+    for instruction in instructions:
+        if instruction > 0:
+            offset = current_pos
+        elif current_pos == 0:
+            offset = 0
+        else:
+            offset = 100 - current_pos
+        passed += (abs(instruction) + offset) // 100
+        # python's % is never negative, same as the (99 + (pos + 1)) % 100 dance above
+        current_pos = (current_pos + instruction) % 100
+        if current_pos == 0:
+            landed += 1
+    return landed, passed
+
+def read_instructions(fin, chunk_size=1 << 16):
+    """Yield the signed moves from a binary file handle, reading it chunk by chunk."""
+    leftover = b""
+    while True:
+        chunk = fin.read(chunk_size)
+        if not chunk:
+            break
+        tokens = (leftover + chunk).split()
+        # the last token might continue in the next chunk
+        leftover = b"" if chunk[-1:].isspace() or not tokens else tokens.pop()
+        for token in tokens:
+            yield _parse_instruction(token)
+    if leftover:
+        yield _parse_instruction(leftover)
+
+def _parse_instruction(token):
+    if token[0] == ord("L"):
+        return -int(token[1:])
+    return int(token[1:])
+
+def solve_numpy(instructions, chunk_size=1 << 20):
+    """
+    Vectorised solve(): the dial is just a prefix sum of the moves mod 100.
+    Works through the instructions chunk by chunk and carries the dial position over,
+    so this scales to however many moves you throw at it. An ndarray is sliced as is;
+    anything else has to be unboxed move by move, so for files use
+    solve_numpy_chunks(read_instructions_numpy(fin)) instead.
+    """
+    import numpy as np
+    if isinstance(instructions, np.ndarray):
+        return solve_numpy_chunks(instructions[i:i + chunk_size] for i in range(0, len(instructions), chunk_size))
+    return solve_numpy_chunks(_boxed_chunks(instructions, chunk_size))
+
+def _boxed_chunks(instructions, chunk_size):
+    import numpy as np
+    it = iter(instructions)
+    while True:
+        chunk = np.fromiter(itertools.islice(it, chunk_size), dtype=np.int64)
+        if chunk.size == 0:
+            return
+        yield chunk
+
+def solve_numpy_chunks(chunks):
+    """solve_numpy() over an iterable of int64 arrays of moves, dial position carried from one to the next."""
+    import numpy as np
+    current_pos = 50
+    landed = 0
+    passed = 0
+    for chunk in chunks:
+        if chunk.size == 0:
+            continue
+        # only the remainder matters for the position, which also keeps cumsum from overflowing
+        positions = (current_pos + np.cumsum(chunk % 100)) % 100
+        previous = np.empty_like(positions)
+        previous[0] = current_pos
+        previous[1:] = positions[:-1]
+
+        landed += int(np.count_nonzero(positions == 0))
+        # same offsets as in part2: moving right counts from pos, moving left from 100 - pos (or 0)
+        offset = np.where(chunk > 0, previous, (100 - previous) % 100)
+        passed += int(np.floor_divide(np.abs(chunk) + offset, 100).sum())
+        current_pos = int(positions[-1])
+    return landed, passed
+
+def read_instructions_numpy(fin, chunk_size=1 << 22):
+    """
+    read_instructions() for numpy: yields int64 arrays of signed moves, one per chunk of
+    the file, parsed straight from the bytes without a python int per move in between.
+    """
+    leftover = b""
+    while True:
+        chunk = fin.read(chunk_size)
+        if not chunk:
+            break
+        data = leftover + chunk
+        # the last line might continue in the next chunk
+        cut = data.rfind(b"\n") + 1
+        leftover = data[cut:]
+        if cut:
+            yield _parse_instructions_numpy(data[:cut])
+    if leftover.strip():
+        yield _parse_instructions_numpy(leftover)
+
+def _parse_instructions_numpy(data):
+    import numpy as np
+    buf = np.frombuffer(data, dtype=np.uint8)
+    letters = np.flatnonzero((buf == ord("L")) | (buf == ord("R")))
+    is_digit = (buf >= ord("0")) & (buf <= ord("9"))
+    # +1 where a run of digits starts, -1 one past where it ends
+    edges = np.diff(is_digit.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) != len(letters) or not np.array_equal(starts, letters + 1):
+        raise ValueError("malformed instructions, expected lines like L68 or R48")
+    if len(starts) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    lengths = ends - starts
+    digits = np.flatnonzero(is_digit)
+    # every digit times 10 ** (how many digits follow it in its number), then one sum per number
+    place = np.repeat(ends, lengths) - 1 - digits
+    values = (buf[digits] - ord("0")).astype(np.int64) * (10 ** np.arange(19, dtype=np.int64))[place]
+    moves = np.add.reduceat(values, np.cumsum(lengths) - lengths)
+    return np.where(buf[letters] == ord("L"), -moves, moves)
+
+def load_instructions_numpy(path):
+    import numpy as np
+    with open(path, "rb") as fin:
+        chunks = list(read_instructions_numpy(fin))
+    return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+@variant(1, load=load_instructions_numpy, enabled=HAVE_NUMPY)
+def part1_numpy(instructions):
+    return solve_numpy(instructions)[0]
+
+@variant(2, load=load_instructions_numpy, enabled=HAVE_NUMPY)
+def part2_numpy(instructions):
+    return solve_numpy(instructions)[1]
+
+def summarize(instructions):
+    """
+    What a run of moves does to the dial, for all 100 positions it could start at:
+    (net, landed, passed), where starting at p it ends up at (p + net) % 100, having
+    landed on zero landed[p] times and passed it passed[p] times (as in part1/part2).
+    Summaries of consecutive runs combine with compose(), so a long log can be cut into
+    chunks that are summarized independently. Still one pass, O(1) per move.
+    """
+    net = 0  # where the dial is relative to the start, mod 100
+    at = [0] * 100  # how often each relative position was landed on
+    # +1 over a cyclic range of start positions for every move that passes zero once more
+    # depending on where it starts; kept as a difference array and summed up at the end
+    diff = [0] * 101
+    laps = 0  # passed no matter where we start
+    for instruction in instructions:
+        clicks = instruction if instruction > 0 else -instruction
+        laps += clicks // 100
+        rest = clicks % 100
+        if rest:
+            # the dial stands at q = (p + net) % 100 before the move. That passes zero once more
+            # for q >= 100 - rest going right, and for 1 <= q <= rest going left.
+            lo = ((100 - rest if instruction > 0 else 1) - net) % 100
+            hi = lo + rest
+            diff[lo] += 1
+            if hi <= 100:
+                diff[hi] -= 1
+            else:
+                diff[0] += 1
+                diff[hi - 100] -= 1
+        net = (net + instruction) % 100
+        at[net] += 1
+    landed = [at[-p % 100] for p in range(100)]
+    passed = [laps + n for n in itertools.accumulate(diff[:100])]
+    return net, landed, passed
+
+# nothing happened: start anywhere, stay there, never see zero
+EMPTY_SUMMARY = (0, [0] * 100, [0] * 100)
+
+def compose(first, second):
+    """The summary of first's moves followed by second's."""
+    net1, landed1, passed1 = first
+    net2, landed2, passed2 = second
+    # wherever we start, second starts where first left off
+    middle = [(p + net1) % 100 for p in range(100)]
+    return (
+        (net1 + net2) % 100,
+        [landed1[p] + landed2[m] for p, m in enumerate(middle)],
+        [passed1[p] + passed2[m] for p, m in enumerate(middle)],
+    )
+
+def solve_parallel(path, workers=None, min_chunk_size=1 << 20):
+    """
+    solve() spread over processes: mmap the file, cut it at line breaks into a few chunks per
+    worker, summarize() the chunks in a process pool and compose the summaries in order.
+    Workers only get (path, start, end) and send back 201 numbers, the moves never get pickled.
+    """
+    import functools
+    import mmap
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            chunks = max(1, min(workers * 4, size // min_chunk_size))
+            bounds = _line_bounds(mm, chunks)
+
+    ranges = list(zip(bounds, bounds[1:]))
+    if workers <= 1 or len(ranges) == 1:
+        summaries = [_summarize_range(path, start, end) for start, end in ranges]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            summaries = list(ex.map(_summarize_range, [path] * len(ranges), *zip(*ranges)))
+
+    _, landed, passed = functools.reduce(compose, summaries, EMPTY_SUMMARY)
+    return landed[50], passed[50]
+
+def _line_bounds(mm, chunks):
+    """Offsets cutting mm into about equal chunks, each one ending right after a newline."""
+    size = len(mm)
+    bounds = [0]
+    for k in range(1, chunks):
+        cut = mm.find(b"\n", max(bounds[-1], k * size // chunks))
+        if cut == -1:
+            break
+        bounds.append(cut + 1)
+    if bounds[-1] != size:
+        bounds.append(size)
+    return bounds
+
+def _summarize_range(path, start, end):
+    import mmap
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return summarize(_parse_instruction(token) for token in mm[start:end].split())
+
+@variant(1)  # takes the path, so this one is timed including reading the file
+def part1_parallel(path):
+    return solve_parallel(path)[0]
+
+@variant(2)
+def part2_parallel(path):
+    return solve_parallel(path)[1]
+
+def check_parallel(seed=0, rounds=50, workers=2):
+    """
+    Random move logs (some moves of whole turns, some tiny) through summarize/compose at a
+    random split point and through solve_parallel with small chunks and several workers,
+    against part1/part2. Returns the number of mismatches.
+    """
+    import random
+    import tempfile
+    rng = random.Random(seed)
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "moves.txt")
+        for i in range(rounds):
+            moves = []
+            for _ in range(rng.randint(0, 2_000)):
+                clicks = rng.choice([rng.randint(1, 99), rng.randint(1, 1_000), 100 * rng.randint(1, 3)])
+                moves.append(clicks if rng.random() < 0.5 else -clicks)
+            expected = (part1(moves), part2(moves))
+
+            split = rng.randint(0, len(moves))
+            _, landed, passed = compose(summarize(moves[:split]), summarize(moves[split:]))
+            composed = (landed[50], passed[50])
+
+            with open(path, "w") as f:
+                f.write("".join(f"{'R' if m > 0 else 'L'}{abs(m)}\n" for m in moves))
+            parallel = solve_parallel(path, workers, min_chunk_size=rng.randint(1, 4_000))
+
+            if composed != expected or parallel != expected:
+                mismatches += 1
+                print(f'round {i}: part1/part2 {expected}, compose {composed}, solve_parallel {parallel}: MISMATCH')
+    return mismatches
+
 def main():
-    with open("input.txt", "rt") as fin:
-        lines = [line.strip() for line in fin]
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Day 1: Secret Entrance"
+    )
+    parser.add_argument(
+        "--engine",
+        help="implementation used for solving",
+        choices=["python", "numpy", "parallel"],
+        default="python",
+    )
+    parser.add_argument(
+        "--workers",
+        help="worker processes for --engine parallel (default: cpu count)",
+        type=int,
+    )
+    parser.add_argument(
+        "--check",
+        help="check summarize/compose/solve_parallel against part1/part2 on random moves",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--seed",
+        help="seed for --check",
+        type=int,
+        default=0,
+    )
+    args = parser.parse_args()
+    if args.engine == "numpy" and not HAVE_NUMPY:
+        parser.error("--engine numpy requires numpy to be installed")
 
-    instructions = [int(line[1:]) * -1 if line[0] == "L" else int(line[1:]) for line in lines]
+    if args.check:
+        rounds = 50
+        mismatches = check_parallel(args.seed, rounds, max(2, args.workers or 2))
+        print(f'{rounds - mismatches}/{rounds} random logs: {"OK" if not mismatches else "MISMATCH"}')
+        return
 
-    password1 = part1(instructions)
-    password2 = part2(instructions)
+    if args.engine == "parallel":
+        password1, password2 = solve_parallel("input.txt", args.workers)
+        print(f'password 1 is {password1}; password 2 is {password2}')
+        return
+
+    with open("input.txt", "rb") as fin:
+        if args.engine == "numpy":
+            password1, password2 = solve_numpy_chunks(read_instructions_numpy(fin))
+        else:
+            password1, password2 = solve(read_instructions(fin))
 
     print(f'password 1 is {password1}; password 2 is {password2}')
 
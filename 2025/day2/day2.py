@@ -1,8 +1,43 @@
-import re
+import os
+import sys
+try:
+    from mapped_input import MappedInput
+    from variants import generator, variant
+except ImportError:
+    # HACK: we're being run directly instead of through run.py, so the shared tools two
+    #       directories up aren't importable yet.
+    sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    from mapped_input import MappedInput
+    from variants import generator, variant
 import bisect
+import functools
+import itertools
+from array import array
 
+@generator(sizes=[100, 1_000, 10_000, 100_000, 1_000_000])
+def generate_input(size, rng):
+    """10 ranges, each size IDs wide, somewhere below 10^10."""
+    ranges = []
+    for _ in range(10):
+        start = rng.randint(1, 10**10 - size)
+        ranges.append(f"{start}-{start + size}")
+    return ",".join(ranges) + "\n"
+
+def _read_lines(path):
+    return [field.tobytes().decode() for field in MappedInput(path).fields(b",")]
+
+def load_ranges(path):
+    """(start, end) pairs straight from the mapped file, without going through str first."""
+    ranges = []
+    for field in MappedInput(path).fields(b","):
+        start, end = field.tobytes().split(b"-", 1)
+        ranges.append((int(start), int(end)))
+    return ranges
+
+@variant(1, load=_read_lines)
 def part1_regex(lines):
     """First iteration. Naive approach. Works, but runs >1s."""
+    import re
     seen = set()
     t = re.compile(r'^(\d+)\1')
     for line in lines:
@@ -12,6 +47,7 @@ def part1_regex(lines):
                 seen.add(n)
     return sum(seen)
 
+@variant(1, load=_read_lines)
 def part1_half_comparison(lines):
     """Optimisation 1: use a half-comparison and see if both ends are the same. Way faster (430ms)."""
     seen = set()
@@ -27,6 +63,7 @@ def part1_half_comparison(lines):
                 seen.add(num)
     return sum(seen)
 
+@variant(1, load=_read_lines)
 def part1_generate(lines):
     """
     Optimisation 2: Find the maximum number we need to generate and only generate the numbers that repeat digits up to that max.
@@ -79,11 +116,13 @@ def gen_repeated_up_to(max):
     results.sort()
     return results
 
+@variant(2, load=_read_lines)
 def part2(lines):
     """
     Basically part one but another half second slower thanks to the repeated backreference.
     I do not particulary care for optimising this, Copilot suggested KMP.
     """
+    import re
     seen = set()
     t = re.compile(r'^(\d+)\1+$')
     for line in lines:
@@ -93,12 +132,219 @@ def part2(lines):
                 seen.add(n)
     return sum(seen)
 
+@variant(2, load=_read_lines, solver=True)
+def part2_closed_form(lines):
+    """
+    Optimisation for part 2: stop looking at every single number and count them instead.
+    Every invalid ID of length L with a repeating block of length p (p | L, p < L) is just
+    a * (10^(L-p) + ... + 10^p + 1) for a p-digit block a. So for each range and each length
+    the invalid IDs form a handful of arithmetic progressions, which we can sum directly.
+
+    Something like 222222 has periods 1, 2 and 3 at the same time; to only count it once we
+    do inclusion-exclusion over the divisor periods (Möbius function on L/p).
+    Runtime depends on the number of ranges and digits, not on how wide the ranges are.
+    `part2` stays around as the reference to check this against (--check).
+    """
+    total = 0
+    for start, end in _merge_ranges(_parse_ranges(lines)):
+        # ranges are half-open, same as range(start, end) in the other solutions
+        total += _sum_repeated_between(start, end - 1)
+    return total
+
+def _parse_ranges(lines):
+    ranges = []
+    for line in lines:
+        start_str, end_str = line.split('-', 1)
+        ranges.append((int(start_str), int(end_str)))
+    return ranges
+
+def _merge_ranges(ranges):
+    """Coalesce overlapping/adjacent half-open ranges so nothing gets counted twice."""
+    merged = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+def _sum_repeated_between(lo, hi):
+    """Sum of all repeated-block numbers in [lo, hi] (inclusive)."""
+    if hi < lo:
+        return 0
+    total = 0
+    for length in range(len(str(lo)), len(str(hi)) + 1):
+        for period, weight in _period_weights(length):
+            total += weight * _sum_with_period(lo, hi, length, period)
+    return total
+
+def _sum_with_period(lo, hi, length, period):
+    # all numbers of `length` digits made of a `period`-digit block: a * rep
+    rep = (10**length - 1) // (10**period - 1)
+    a_lo = max(10**(period - 1), -(-lo // rep))
+    a_hi = min(10**period - 1, hi // rep)
+    if a_hi < a_lo:
+        return 0
+    return rep * (a_lo + a_hi) * (a_hi - a_lo + 1) // 2
+
+@functools.cache
+def _period_weights(length):
+    """
+    (period, weight) pairs for inclusion-exclusion over the proper divisors of length.
+    The weight is -mu(length / period); periods with mu == 0 are already covered by others.
+    """
+    weights = []
+    for period in range(1, length):
+        if length % period:
+            continue
+        mu = _mobius(length // period)
+        if mu:
+            weights.append((period, -mu))
+    return tuple(weights)
+
+def _mobius(n):
+    result = 1
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            n //= p
+            if n % p == 0:
+                return 0
+            result = -result
+        p += 1
+    if n > 1:
+        result = -result
+    return result
+
+def gen_repeated_any_up_to(max):
+    """Like gen_repeated_up_to, but for any number of repeats (part 2 rules). Sorted, no duplicates."""
+    results = set()
+    max_digits = len(str(max))
+    for length in range(2, max_digits + 1):
+        for period in range(1, length):
+            if length % period:
+                continue
+            rep = (10**length - 1) // (10**period - 1)
+            for a in range(10**(period - 1), 10**period):
+                val = a * rep
+                if val > max:
+                    break
+                results.add(val)
+    return sorted(results)
+
+
+class RangeIndex:
+    """
+    Sorted table of candidate IDs plus prefix sums, so the sum over a range is two bisects
+    and a subtraction. Build it once for the biggest max you need and query as many range
+    lists against it as you like; ranges are merged first, which takes care of duplicates.
+    """
+
+    def __init__(self, values, max):
+        self.max = max
+        # a memoryview is a table straight from the cache, no need to copy it
+        self.values = values if isinstance(values, memoryview) else array('q', values)
+        try:
+            self.prefix = array('q', itertools.accumulate(self.values, initial=0))
+        except OverflowError:
+            # too big for 64 bits; python ints will do.
+            self.prefix = list(itertools.accumulate(self.values, initial=0))
+
+    @classmethod
+    def part1(cls, max):
+        import cache
+        return cls(cache.table("day2-repeated", gen_repeated_up_to, max), max)
+
+    @classmethod
+    def part2(cls, max):
+        import cache
+        return cls(cache.table("day2-repeated-any", gen_repeated_any_up_to, max), max)
+
+    def sum_between(self, start, end):
+        """Sum of all candidates in [start, end)."""
+        if end - 1 > self.max:
+            raise ValueError(f'range {start}-{end} exceeds index max {self.max}')
+        lo = bisect.bisect_left(self.values, start)
+        hi = bisect.bisect_left(self.values, end)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def sum_ranges(self, ranges):
+        return sum(self.sum_between(start, end) for start, end in _merge_ranges(ranges))
+
+
+@variant(1, load=_read_lines, solver=True)
+def part1_indexed(lines, index=None):
+    """
+    Optimisation 3: same table as part1_generate, but with prefix sums and merged ranges
+    instead of walking slices into a set.
+    """
+    ranges = _parse_ranges(lines)
+    if index is None:
+        index = RangeIndex.part1(_max_end(ranges) - 1)
+    return index.sum_ranges(ranges)
+
+@variant(2, load=_read_lines)
+def part2_indexed(lines, index=None):
+    ranges = _parse_ranges(lines)
+    if index is None:
+        index = RangeIndex.part2(_max_end(ranges) - 1)
+    return index.sum_ranges(ranges)
+
+def solve_files(paths):
+    """Solve a batch of range files, generating the candidate tables only once for all of them."""
+    per_file = [load_ranges(path) for path in paths]
+    max_end = max((_max_end(ranges) for ranges in per_file), default=0)
+    index1 = RangeIndex.part1(max_end - 1)
+    index2 = RangeIndex.part2(max_end - 1)
+    return [(path, index1.sum_ranges(ranges), index2.sum_ranges(ranges)) for path, ranges in zip(paths, per_file)]
+
+def _max_end(ranges):
+    return max((end for _, end in ranges), default=0)
+
 def main():
-    with open("input.txt", "rt") as fin:
-        lines = [part.strip() for raw in fin for part in raw.split(',')]
-    lines_list = list(lines)
-    result1 = part1_generate(lines_list)
-    result2 = part2(lines_list)
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Day 2: Gift Shop"
+    )
+    parser.add_argument(
+        "--check",
+        help="check the closed-form part 2 against the regex version",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="don't use (or fill) the answer/table cache",
+        action="store_true",
+    )
+    parser.add_argument(
+        "files",
+        help="range files to solve in one go (default: input.txt)",
+        nargs="*",
+    )
+    args = parser.parse_args()
+
+    if args.no_cache:
+        os.environ["AOC_CACHE"] = ""
+
+    if args.files:
+        for path, result1, result2 in solve_files(args.files):
+            print(f'{path}: Result 1: {result1}; Result 2: {result2}')
+        return
+
+    if args.check:
+        lines_list = _read_lines("input.txt")
+        expected = part2(lines_list)
+        got = part2_closed_form(lines_list)
+        print(f'regex: {expected}; closed form: {got}; {"OK" if expected == got else "MISMATCH"}')
+        return
+
+    # unchanged input and unchanged code: the answers come straight out of the cache
+    import cache
+    result1, _ = cache.result(part1_indexed, "input.txt", lambda: part1_indexed(_read_lines("input.txt")))
+    result2, _ = cache.result(part2_closed_form, "input.txt", lambda: part2_closed_form(_read_lines("input.txt")))
     print(f'Result 1: {result1}\nResult 2: {result2}')
 
 if __name__ == "__main__":
@@ -1,10 +1,29 @@
 import sys
 import os
-# HACK: I don't want to copy my benchmarking tools into every solution directory,
-#       so let's just modify the path at runtime and import from there.
-sys.path.insert(1, os.path.join(sys.path[0], '..', '..'))
-from bench import *
+try:
+    from variants import HAVE_NUMPY, generator, variant
+except ImportError:
+    # HACK: we're being run directly instead of through run.py, so the shared tools two
+    #       directories up aren't importable yet.
+    sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    from variants import HAVE_NUMPY, generator, variant
 
+@generator(sizes=[100, 1_000, 10_000, 100_000])
+def generate_input(size, rng):
+    """size banks of 100 batteries each."""
+    return "".join("".join(rng.choice("123456789") for _ in range(100)) + "\n" for _ in range(size))
+
+def load_lines(path):
+    with open(path, "rt") as fin:
+        return [line.strip() for line in fin]
+
+def load_banks(path):
+    # plain bytes on purpose: for lines this short, a memoryview per line (MappedInput.lines)
+    # is both slower to make and bigger than the bytes object itself
+    with open(path, "rb") as fin:
+        return [line.strip() for line in fin]
+
+@variant(1, load=load_lines)
 def part1(lines):
     total_jolts = 0
     for line in lines:
@@ -28,6 +47,7 @@ def part1(lines):
         total_jolts += jolts
     return total_jolts
 
+@variant(2, load=load_lines)
 def part2(lines):
     total_jolts = 0
 
@@ -64,6 +84,7 @@ def part2(lines):
 
     return total_jolts
 
+@variant(2, load=load_lines)
 def part2_alternate(lines):
     total_jolts = 0
 
@@ -88,6 +109,7 @@ def part2_alternate(lines):
 
             # potential optimization: skip search if we already have the max digit
             # benchmarks show this is not significantly faster, but let's keep it for posterity
+            # (turns out largest is always -1 here, so the check never fires; see max_joltage instead)
             if largest != 9:
                 for idx, v in enumerate(search_bank[:can_take+1]):
                     if v > largest:
@@ -104,10 +126,93 @@ def part2_alternate(lines):
 
     return total_jolts
 
+def max_joltage(bank, k):
+    """
+    Largest k-digit number we can pick from bank (keeping the order), in a single pass.
+    Keep a stack of chosen digits; whenever a bigger digit comes along and we can still
+    afford to drop some, pop the smaller ones off first. Works on the raw bytes: ascii
+    digits compare the same way the numbers do, so there's no int() per character.
+
+    Banks shorter than k (never in a real input, those are 100 long) deliberately don't
+    match part1/part2: those run off the end of the bank and come back with nonsense
+    (part2([b'12345']) is negative). Here we take every battery and pad with zeros,
+    i.e. 12345 -> 123450000000 for k=12, which at least is a k-digit reading.
+    """
+    if len(bank) < k:
+        # not enough batteries: take them all and pad with zeros (see above)
+        return (int(bank) if bank else 0) * 10**(k - len(bank))
+    drop = len(bank) - k
+    stack = bytearray()
+    for d in bank:
+        while drop and stack and stack[-1] < d:
+            stack.pop()
+            drop -= 1
+        stack.append(d)
+    return int(stack[:k])
+
+def total_joltage(lines, k):
+    return sum(max_joltage(bank, k) for bank in lines)
+
+@variant(1, load=load_banks, solver=True)
+def part1_stack(lines):
+    return total_joltage(lines, 2)
+
+@variant(2, load=load_banks, solver=True)
+def part2_stack(lines):
+    return total_joltage(lines, 12)
+
+def total_joltage_numpy(lines, k):
+    """
+    Same greedy as part2, but for all banks of the same length at once: stack them into a
+    uint8 digit matrix and do the windowed argmax per pick for every row together.
+    Ragged input gets bucketed by line length. The per-position digit sums are combined
+    with python ints at the end, so k can go way past what fits into 64 bits.
+    Banks shorter than k go through max_joltage, so they're padded the same way (and
+    don't match part2 either).
+    """
+    import numpy as np
+    buckets = {}
+    total = 0
+    for bank in lines:
+        if len(bank) < k:
+            total += max_joltage(bank, k)
+            continue
+        buckets.setdefault(len(bank), []).append(bank)
+
+    for length, banks in buckets.items():
+        digits = np.frombuffer(b"".join(banks), dtype=np.uint8).reshape(len(banks), length)
+        digits = (digits - ord('0')).astype(np.int8)  # signed, so -1 can mark "outside the window"
+        for place, column_sum in enumerate(_pick_digits_numpy(digits, k)):
+            total += int(column_sum) * 10**(k - 1 - place)
+    return total
+
+def _pick_digits_numpy(digits, k):
+    """Yield the sum over all rows of the digit picked at each of the k positions."""
+    import numpy as np
+    rows, length = digits.shape
+    row_idx = np.arange(rows)
+    cols = np.arange(length)
+    start = np.zeros(rows, dtype=np.int64)
+    for i in range(k):
+        end = length - k + i  # last index we may still take from, same for every row
+        lo = int(start.min())
+        window = digits[:, lo:end + 1]
+        # everything before the row's own start is out of the window
+        masked = np.where(cols[lo:end + 1] >= start[:, None], window, np.int8(-1))
+        idx = masked.argmax(axis=1) + lo  # first max, like the strict > in part2
+        yield digits[row_idx, idx].sum(dtype=np.int64)
+        start = idx + 1
+
+@variant(1, load=load_banks, enabled=HAVE_NUMPY)
+def part1_numpy(lines):
+    return total_joltage_numpy(lines, 2)
+
+@variant(2, load=load_banks, enabled=HAVE_NUMPY)
+def part2_numpy(lines):
+    return total_joltage_numpy(lines, 12)
+
 def main():
-    with open("input.txt", "rt") as fin:
-        lines = [line.strip() for line in fin]
-    lines_lst = list(lines) # create an immutable reference
+    banks = load_banks("input.txt")
 
     import argparse
     parser = argparse.ArgumentParser(
@@ -118,7 +223,20 @@ def main():
         help="run benchmark on part 2 implementations",
         action="store_true",
     )
+    parser.add_argument(
+        "--solve",
+        help="solve both parts",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--engine",
+        help="implementation used for --solve",
+        choices=["python", "numpy"],
+        default="python",
+    )
     args = parser.parse_args()
+    if args.engine == "numpy" and not HAVE_NUMPY:
+        parser.error("--engine numpy requires numpy to be installed")
 
     if not args.bench and not args.solve:
         print("Please specify --bench or --solve")
@@ -126,18 +244,16 @@ def main():
 
     if args.bench:
         print("Benchmarking part 2 implementations...")
-        r1 = bench_func(part2, lines_lst, repeat=20)
-        r2 = bench_func(part2_alternate, lines_lst, repeat=20)
-
-        print_stats(r1)
-        print()
-        print_stats(r2)
-        print()
-        print_comparison(r1, r2)
+        import bench
+        bench.run_variants(sys.modules[__name__], "input.txt", part=2)
         return
 
-    sol1 = part1(lines_lst)
-    sol2 = part2(lines_lst)
+    if args.engine == "numpy":
+        sol1 = part1_numpy(banks)
+        sol2 = part2_numpy(banks)
+    else:
+        sol1 = part1_stack(banks)
+        sol2 = part2_stack(banks)
     print(f"part 1: {sol1}; part 2: {sol2}")
     return
 
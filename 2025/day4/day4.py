@@ -1,17 +1,40 @@
 import sys
 import os
-# HACK: I don't want to copy my benchmarking tools into every solution directory,
-#       so let's just modify the path at runtime and import from there.
-sys.path.insert(1, os.path.join(sys.path[0], '..', '..'))
-import bench
+try:
+    from mapped_input import MappedInput
+    from variants import HAVE_NUMPY, generator, variant
+except ImportError:
+    # HACK: we're being run directly instead of through run.py, so the shared tools two
+    #       directories up aren't importable yet.
+    sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    from mapped_input import MappedInput
+    from variants import HAVE_NUMPY, generator, variant
 
-import argparse
 import copy
-from typing import List, Tuple
+import math
 
 # top, top right, right, bottom right, bottom, bottom left, left, top left
 DIRECTIONS = [(-1, 0), (-1, 1), (0, 1), (1,1), (1, 0), (1,-1), (0, -1), (-1,-1)]
 
+@generator(sizes=[1_000, 10_000, 100_000, 1_000_000])
+def generate_input(size, rng):
+    """A square grid of about size cells, 3 out of 4 of them paper rolls."""
+    side = max(1, math.isqrt(size))
+    return "".join("".join('@' if rng.random() < 0.75 else '.' for _ in range(side)) + "\n" for _ in range(side))
+
+def _fresh(grid):
+    if isinstance(grid, (FlatGrid, BitRows)):
+        return grid.copy()
+    return [row.copy() for row in grid]
+
+def load_grid(path):
+    with open(path, 'rt') as f:
+        return [[c for c in line.strip()] for line in f if line.strip()]
+
+def load_flat_grid(path):
+    return FlatGrid.from_file(path)
+
+@variant(1, load=load_grid)
 def part1_copy(grid):
     #    print("=== BEFORE ===")
     #    for row in grid:
@@ -23,8 +46,8 @@ def part1_copy(grid):
     can_take = 0
     # top, top right, right, bottom right, bottom, bottom left, left, top left
     directions = [(-1, 0), (-1, 1), (0, 1), (1,1), (1, 0), (1,-1), (0, -1), (-1,-1)]
-    for r, row in enumerate(grid):
-        for c in row:
+    for r in range(rows):
+        for c in range(cols):
             cell = grid[r][c]
             if cell != '@':
                 new_grid[r][c] = cell
@@ -48,6 +71,7 @@ def part1_copy(grid):
 #        print("".join(row))
     return can_take, new_grid
 
+@variant(2, load=load_grid)
 def part2_copy(grid):
     can_take = 0
     current_grid = [row.copy() for row in grid]
@@ -63,6 +87,7 @@ def part2_copy(grid):
 #        print("".join(row))
 #    return can_take, new_grid
 
+@variant(1, load=load_grid, fresh=_fresh, solver=True)
 def part1_inplace(grid):
 #    print("=== BEFORE ===")
 #    for row in grid:
@@ -78,7 +103,7 @@ def part1_inplace(grid):
                 row[c] = '.'
 
     # keep track of what we can remove, but don't change whilst we're counting
-    can_take: List[Tuple[int, int]] = []
+    can_take: list[tuple[int, int]] = []
     for r in range(rows):
         for c in range(cols):
             if grid[r][c] != '@':
@@ -95,6 +120,7 @@ def part1_inplace(grid):
 
     return len(can_take), grid
 
+@variant(2, load=load_grid, fresh=_fresh, solver=True)
 def part2_inplace(grid):
     can_take = 0
     while True:
@@ -104,7 +130,384 @@ def part2_inplace(grid):
         can_take += added
     return can_take
 
+ROLL = ord('@')
+TAKEN = ord('x')
+EMPTY = ord('.')
+
+class FlatGrid:
+    """
+    The whole grid in one bytearray, row after row, with a border of '.' around it.
+    Thanks to the border, neighbours are just fixed index offsets and we never have to
+    bounds-check; copying the grid is a single bytearray() call instead of a list per row.
+    """
+    __slots__ = ("rows", "cols", "width", "cells", "offsets")
+
+    def __init__(self, rows, cols, cells):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.cells = cells
+        self.offsets = tuple(dx * self.width + dy for dx, dy in DIRECTIONS)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls.from_lines([line for line in (line.strip() for line in data.splitlines()) if line])
+
+    @classmethod
+    def from_lines(cls, lines):
+        rows = len(lines)
+        cols = len(lines[0]) if rows else 0
+        width = cols + 2
+        cells = bytearray(b'.' * ((rows + 2) * width))
+        for r, line in enumerate(lines):
+            start = (r + 1) * width + 1
+            cells[start:start + cols] = line
+        return cls(rows, cols, cells)
+
+    @classmethod
+    def from_file(cls, path):
+        # the rows get copied from the mapped file right into cells, no bytes/list of the file in between
+        return cls.from_lines(list(MappedInput(path).lines(skip_empty=True)))
+
+    def copy(self):
+        return FlatGrid(self.rows, self.cols, bytearray(self.cells))
+
+    def __str__(self):
+        w = self.width
+        return "\n".join(self.cells[(r + 1) * w + 1:(r + 2) * w - 1].decode() for r in range(self.rows))
+
+def _removable_flat(cells, offsets, start=0, end=None):
+    # find() skips over the non-rolls in C, so we only spend python time on actual rolls
+    if end is None:
+        end = len(cells)
+    can_take = []
+    i = cells.find(ROLL, start, end)
+    while i != -1:
+        neighbors = 0
+        for o in offsets:
+            if cells[i + o] == ROLL:
+                neighbors += 1
+        if neighbors < 4:
+            can_take.append(i)
+        i = cells.find(ROLL, i + 1, end)
+    return can_take
+
+@variant(1, load=load_flat_grid)
+def part1_flat_copy(grid):
+    new_grid = grid.copy()
+    new_grid.cells[:] = new_grid.cells.replace(b'x', b'.')
+    can_take = _removable_flat(grid.cells, grid.offsets)
+    for i in can_take:
+        new_grid.cells[i] = TAKEN
+    return len(can_take), new_grid
+
+@variant(2, load=load_flat_grid)
+def part2_flat_copy(grid):
+    can_take = 0
+    current_grid = grid
+    while True:
+        added, current_grid = part1_flat_copy(current_grid)
+        if added == 0:
+            break
+        can_take += added
+    return can_take
+
+@variant(1, load=load_flat_grid, fresh=_fresh)
+def part1_flat_inplace(grid):
+    cells = grid.cells
+    cells[:] = cells.replace(b'x', b'.')
+    can_take = _removable_flat(cells, grid.offsets)
+    for i in can_take:
+        cells[i] = TAKEN
+    return len(can_take), grid
+
+@variant(2, load=load_flat_grid, fresh=_fresh)
+def part2_flat_inplace(grid):
+    can_take = 0
+    while True:
+        added, _ = part1_flat_inplace(grid)
+        if added == 0:
+            break
+        can_take += added
+    return can_take
+
+def removal_rounds_shared(grid, workers=None, max_rounds=None):
+    """
+    part2_inplace's round loop, with the grid split into row bands over worker processes.
+    The FlatGrid lives in one shared_memory block; every round each worker copies its band
+    plus one halo row on either side out of it, finds the removable rolls, and only writes
+    them back once everyone is past the barrier, so a round still only sees the state from
+    before it. The grid is never pickled, only the per-round counts travel (a shared Array).
+    Returns the number of rolls removed in each round; grid itself is left alone.
+    """
+    import multiprocessing
+    import threading
+    from multiprocessing import shared_memory
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, grid.rows))
+    if grid.rows == 0:
+        return []
+
+    size = len(grid.cells)
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:size] = grid.cells
+        # we take part in the barrier as well, to collect the counts of every round
+        barrier = multiprocessing.Barrier(workers + 1)
+        counts = multiprocessing.Array('q', workers, lock=False)
+        # bands in padded row numbers: 1..rows are the real ones
+        bounds = [1 + grid.rows * w // workers for w in range(workers + 1)]
+        procs = [
+            multiprocessing.Process(
+                target=_shared_band_worker,
+                args=(shm.name, grid.width, bounds[w], bounds[w + 1], barrier, counts, w, max_rounds),
+            )
+            for w in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        waves = []
+        try:
+            while max_rounds is None or len(waves) < max_rounds:
+                barrier.wait()  # everyone has looked at this round's grid
+                barrier.wait()  # and written back their removals and count
+                removed = sum(counts)
+                if removed == 0:
+                    break
+                waves.append(removed)
+        except threading.BrokenBarrierError:
+            raise RuntimeError("a day4 worker died, see its traceback above") from None
+        finally:
+            for p in procs:
+                p.join()
+        return waves
+    finally:
+        shm.close()
+        shm.unlink()
+
+def _shared_band_worker(shm_name, width, start, stop, barrier, counts, index, max_rounds):
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    cells = shm.buf
+    try:
+        offsets = tuple(dx * width + dy for dx, dy in DIRECTIONS)
+        # our band, with the row above and below it as halo
+        lo, hi = (start - 1) * width, (stop + 1) * width
+        rounds = 0
+        while max_rounds is None or rounds < max_rounds:
+            band = bytearray(cells[lo:hi])
+            can_take = _removable_flat(band, offsets, width, len(band) - width)
+            barrier.wait()
+            for i in can_take:
+                cells[lo + i] = EMPTY
+            counts[index] = len(can_take)
+            barrier.wait()
+            # everyone reads the same counts, so everyone stops after the same round
+            if sum(counts) == 0:
+                break
+            rounds += 1
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        del cells  # SharedMemory refuses to close while a view on it is alive
+        shm.close()
+
+@variant(1, load=load_flat_grid)
+def part1_shared(grid, workers=None):
+    waves = removal_rounds_shared(grid, workers, max_rounds=1)
+    return (waves[0] if waves else 0), grid
+
+@variant(2, load=load_flat_grid)
+def part2_shared(grid, workers=None):
+    return sum(removal_rounds_shared(grid, workers))
+
+class BitRows:
+    """
+    One python int per row, bit c set if there's a roll in column c. That way a whole row
+    is handled with a handful of big-int operations instead of one cell at a time, and
+    needs nothing but python (unlike the numpy engine).
+    """
+    __slots__ = ("cols", "rows")
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+
+    @classmethod
+    def from_file(cls, path):
+        # '@' -> 1, everything else 0. int() reads the first column as the highest bit, so
+        # the columns end up mirrored; the neighbourhood is symmetric, so that doesn't matter.
+        table = bytes.maketrans(b'@.x', b'100')
+        lines = list(MappedInput(path).lines(skip_empty=True))
+        cols = len(lines[0]) if lines else 0
+        return cls(cols, [int(line.tobytes().translate(table), 2) for line in lines])
+
+    def copy(self):
+        return BitRows(self.cols, self.rows.copy())
+
+    def __str__(self):
+        return "\n".join(format(row, f'0{self.cols}b').translate(str.maketrans('01', '.@')) for row in self.rows)
+
+def load_bit_rows(path):
+    return BitRows.from_file(path)
+
+def _removable_bits(above, row, below):
+    """The rolls in row with fewer than 4 of their 8 neighbours, all columns at once."""
+    # every neighbour as its own bit plane, lined up with row. Bits shifted out past
+    # either edge don't matter: row has nothing there, so they're masked off at the end.
+    ul, u, ur = above << 1, above, above >> 1
+    dl, d, dr = below << 1, below, below >> 1
+    left, right = row << 1, row >> 1
+    # bit-sliced adders: each bit position is its own little counter.
+    # above and below are 0..3 each (ones + 2 * twos), left + right is 0..2.
+    a1 = (ul & u) | (ur & (ul ^ u))
+    a0 = ul ^ u ^ ur
+    b1 = (dl & d) | (dr & (dl ^ d))
+    b0 = dl ^ d ^ dr
+    m1 = left & right
+    m0 = left ^ right
+    carry = (a0 & b0) | (m0 & (a0 ^ b0))
+    # the ones add up to at most 1 after the carry, so >= 4 means at least two of the twos
+    crowded = (a1 & b1) | (m1 & carry) | ((a1 | b1) & (m1 | carry))
+    return row & ~crowded
+
+def _bits_round(rows, candidates):
+    """Removable bits per row for the rows in candidates, decided on the state before any removal."""
+    n = len(rows)
+    removed = {}
+    for r in candidates:
+        bits = _removable_bits(rows[r - 1] if r else 0, rows[r], rows[r + 1] if r + 1 < n else 0)
+        if bits:
+            removed[r] = bits
+    for r, bits in removed.items():
+        rows[r] ^= bits
+    return removed
+
+@variant(1, load=load_bit_rows, fresh=_fresh)
+def part1_bits(grid):
+    removed = _bits_round(grid.rows, range(len(grid.rows)))
+    return sum(bits.bit_count() for bits in removed.values()), grid
+
+@variant(2, load=load_bit_rows, fresh=_fresh)
+def part2_bits(grid):
+    rows = grid.rows
+    n = len(rows)
+    can_take = 0
+    candidates = range(n)
+    while True:
+        removed = _bits_round(rows, candidates)
+        if not removed:
+            break
+        can_take += sum(bits.bit_count() for bits in removed.values())
+        # a row can only change if it or a row next to it lost something
+        candidates = sorted({r + d for r in removed for d in (-1, 0, 1) if 0 <= r + d < n})
+    return can_take
+
+def removal_waves(grid, max_rounds=None):
+    """
+    Incremental version of the part2_inplace round loop: count every roll's neighbours once,
+    then only look at what changed. Removing a roll decrements its neighbours; whoever drops
+    below 4 is up for removal in the next round. That's O(cells + removals) instead of a
+    full rescan per round. Returns the number of rolls removed in each round.
+    """
+    rows = len(grid)
+    cols = len(grid[0]) if rows else 0
+    # flat grid with a one-cell border so we never have to bounds-check
+    width = cols + 2
+    alive = bytearray((rows + 2) * width)
+    for r, row in enumerate(grid):
+        base = (r + 1) * width + 1
+        for c, cell in enumerate(row):
+            if cell == '@':
+                alive[base + c] = 1
+    offsets = [dx * width + dy for dx, dy in DIRECTIONS]
+
+    counts = [0] * len(alive)
+    frontier = []
+    for i, cell in enumerate(alive):
+        if not cell:
+            continue
+        n = 0
+        for o in offsets:
+            n += alive[i + o]
+        counts[i] = n
+        if n < 4:
+            frontier.append(i)
+
+    waves = []
+    while frontier and (max_rounds is None or len(waves) < max_rounds):
+        waves.append(len(frontier))
+        # take everything first; the round is decided on the state before any removal.
+        for i in frontier:
+            alive[i] = 0
+        next_frontier = []
+        for i in frontier:
+            for o in offsets:
+                j = i + o
+                if alive[j]:
+                    counts[j] -= 1
+                    if counts[j] == 3:  # only ever passes 4 -> 3 once
+                        next_frontier.append(j)
+        frontier = next_frontier
+    return waves
+
+@variant(1, load=load_grid)
+def part1_worklist(grid):
+    """First wave of removal_waves; the grid is left untouched."""
+    waves = removal_waves(grid, max_rounds=1)
+    return (waves[0] if waves else 0), grid
+
+@variant(2, load=load_grid)
+def part2_worklist(grid):
+    return sum(removal_waves(grid))
+
+@variant(1, load=load_grid, enabled=HAVE_NUMPY)
+def part1_numpy(grid):
+    """
+    Same as part1_inplace, but with whole-array operations: pad the grid with a border of
+    empty cells and add up the eight shifted views to get every neighbour count at once.
+    Takes a char grid or a boolean array; returns the count and the remaining rolls as a boolean array.
+    """
+    import numpy as np
+    alive = _as_numpy(grid)
+    padded = np.pad(alive, 1)
+    removable = alive & (_neighbor_counts_numpy(padded) < 4)
+    return int(removable.sum()), alive & ~removable
+
+@variant(2, load=load_grid, enabled=HAVE_NUMPY)
+def part2_numpy(grid):
+    import numpy as np
+    padded = np.pad(_as_numpy(grid), 1)
+    alive = padded[1:-1, 1:-1]  # view, so removals show up in the padded grid as well
+    can_take = 0
+    while True:
+        removable = alive & (_neighbor_counts_numpy(padded) < 4)
+        added = int(removable.sum())
+        if added == 0:
+            break
+        can_take += added
+        alive &= ~removable
+    return can_take
+
+def _as_numpy(grid):
+    import numpy as np
+    if isinstance(grid, np.ndarray):
+        return grid.astype(bool, copy=True)
+    return np.array([[c == '@' for c in row] for row in grid], dtype=bool)
+
+def _neighbor_counts_numpy(padded):
+    import numpy as np
+    rows, cols = padded.shape[0] - 2, padded.shape[1] - 2
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dx, dy in DIRECTIONS:
+        counts += padded[1 + dx:1 + dx + rows, 1 + dy:1 + dy + cols]
+    return counts
+
 def main():
+    import argparse
     parser = argparse.ArgumentParser(
         description="AoC Day 4: Printing Department",
     )
@@ -124,69 +527,81 @@ def main():
         type=int,
         choices=[1, 2],
     )
+    parser.add_argument(
+        "--engine",
+        help="Select the implementation used for solving",
+        choices=["python", "flat", "worklist", "bits", "shared", "numpy"],
+        default="python",
+    )
+    parser.add_argument(
+        "--workers",
+        help="Worker processes for --engine shared (default: cpu count)",
+        type=int,
+    )
+    parser.add_argument(
+        "--waves",
+        help="Print how many rolls get removed in each round",
+        action="store_true",
+    )
     args = parser.parse_args()
+    if args.engine == "numpy" and not HAVE_NUMPY:
+        parser.error("--engine numpy requires numpy to be installed")
+    solve1, solve2 = part1_inplace, part2_inplace
+    if args.engine == "flat":
+        solve1, solve2 = part1_flat_inplace, part2_flat_inplace
+    elif args.engine == "worklist":
+        solve1, solve2 = part1_worklist, part2_worklist
+    elif args.engine == "bits":
+        solve1, solve2 = part1_bits, part2_bits
+    elif args.engine == "shared":
+        import functools
+        solve1 = functools.partial(part1_shared, workers=args.workers)
+        solve2 = functools.partial(part2_shared, workers=args.workers)
+    elif args.engine == "numpy":
+        solve1, solve2 = part1_numpy, part2_numpy
 
     path = 'input.txt'
     if args.test:
         path = 'test.txt'
 
-    with open(path, 'rt') as f:
-        lines = [line.strip() for line in f.readlines()]
-    # first we make a grid to easily traverse it with our direction tuples.
-    grid = [[c for c in line] for line in lines]
+    if args.engine in ("flat", "shared"):
+        # straight from the file's bytes, no per-row or per-cell objects
+        grid = load_flat_grid(path)
+    elif args.engine == "bits":
+        grid = load_bit_rows(path)
+    else:
+        # first we make a grid to easily traverse it with our direction tuples.
+        grid = load_grid(path)
+
+    if args.waves:
+        waves = removal_waves(grid if isinstance(grid, list) else str(grid).split())
+        for i, removed in enumerate(waves, start=1):
+            print(f'round {i}: {removed}')
+        print(f'{len(waves)} rounds, {sum(waves)} removed')
+        return
 
     if args.bench:
-        print(f'Benchmarking solutions {args.part if args.part else "1 and 2"} (copy vs in-place)...\n')
-        # avoid the benchmarking runs mutate grid in-place: provide a fresh copy each run.
-        if args.part == 1:
-            p1_copy = bench.bench_func(part1_copy, grid, repeat=20)
-            p1_inplace = bench.bench_func(lambda _: part1_inplace([row.copy() for row in grid]), None, repeat=20)
-            bench.print_stats(p1_copy)
-            print()
-            bench.print_stats(p1_inplace)
-            print()
-            bench.print_comparison(p1_copy, p1_inplace)
-        elif args.part == 2:
-            p2_copy = bench.bench_func(part2_copy, grid, repeat=20)
-            p2_inplace = bench.bench_func(lambda _: part2_inplace([row.copy() for row in grid]), None, repeat=20) 
-            bench.print_stats(p2_copy)
-            print()
-            bench.print_stats(p2_inplace)
-            print()
-            bench.print_comparison(p2_copy, p2_inplace)
-        else: # run everything
-            p1_copy = bench.bench_func(part1_copy, grid, repeat=20)
-            p1_inplace = bench.bench_func(lambda _: part1_inplace([row.copy() for row in grid]), None, repeat=20)
-            p2_copy = bench.bench_func(part2_copy, grid, repeat=20)
-            p2_inplace = bench.bench_func(lambda _: part2_inplace([row.copy() for row in grid]), None, repeat=20) 
-
-            bench.print_stats(p1_copy)
-            print()
-            bench.print_stats(p1_inplace)
-            print()
-            bench.print_comparison(p1_copy, p1_inplace)
-            print()
-            bench.print_stats(p2_copy)
-            print()
-            bench.print_stats(p2_inplace)
-            print()
-            bench.print_comparison(p2_copy, p2_inplace)
+        print(f'Benchmarking solutions {args.part if args.part else "1 and 2"}...\n')
+        import bench
+        bench.run_variants(sys.modules[__name__], path, part=args.part)
+        if args.part != 1:
+            bench.run_worker_scaling(part2_shared, load_flat_grid(path))
         return
 
     if args.part == 1:
-        sol, _ = part1_inplace(grid)
+        sol, _ = solve1(grid)
         print(f'solution 1: {sol}')
         return
     elif args.part == 2:
-        sol2 = part2_inplace(grid)
+        sol2 = solve2(grid)
         print(f'solution 2: {sol2}')
         return
     else: # everything
-        sol, _ = part1_inplace(grid)
+        # part1 mutates in-place; keep a fresh copy for part2.
+        grid2 = _fresh(grid)
+        sol, _ = solve1(grid)
         print(f'solution 1: {sol}')
-        # part1 mutates in-place; start with a fresh copy for part2.
-        grid2 = [[c for c in line] for line in lines]
-        sol2 = part2_inplace(grid2)
+        sol2 = solve2(grid2)
         print(f'solution 2: {sol2}')
 
 if __name__ == "__main__":
@@ -1,19 +1,39 @@
 import sys
 import os
-# HACK: I don't want to copy my benchmarking tools into every solution directory,
-#       so let's just modify the path at runtime and import from there.
-sys.path.insert(1, os.path.join(sys.path[0], '..', '..'))
-import bench
-import argparse
-from concurrent.futures import ThreadPoolExecutor
+try:
+    from mapped_input import MappedInput
+    from variants import HAVE_NUMPY, generator, variant
+except ImportError:
+    # HACK: we're being run directly instead of through run.py, so the shared tools two
+    #       directories up aren't importable yet.
+    sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+    from mapped_input import MappedInput
+    from variants import HAVE_NUMPY, generator, variant
+import math
 
-from typing import Iterable
+from collections.abc import Iterable
 
+
+@generator(sizes=[1_000, 10_000, 100_000, 1_000_000])
+def generate_input(size, rng):
+    """A worksheet with size problems of four numbers each."""
+    rows = [" ".join(str(rng.randint(1, 9999)) for _ in range(size)) for _ in range(4)]
+    rows.append(" ".join(rng.choice("*+") for _ in range(size)))
+    return "\n".join(rows) + "\n"
+
+
+def load_worksheet(path):
+    with open(path, 'rt') as file:
+        return [line for line in file]
+
+
+@variant(1, load=load_worksheet, solver=True)
 def solve_part1(worksheet: Iterable) -> int:
     problems = list(_parse_input_part1(worksheet))
     return sum(map(_process_problem_part1, problems))
 
 
+@variant(1, load=load_worksheet)
 def solve_part1_mt(worksheet: Iterable, max_workers: int | None = None):
     """
     Multi-threaded version of part 1 solution.
@@ -25,10 +45,116 @@ def solve_part1_mt(worksheet: Iterable, max_workers: int | None = None):
     problems = list(_parse_input_part1(worksheet))
     if max_workers is None:
         max_workers = min(len(problems), max(1, (os.cpu_count() or 1) * 2 ))
+    from concurrent.futures import ThreadPoolExecutor
     with ThreadPoolExecutor(max_workers=max_workers) as ex:
         return sum(ex.map(_process_problem_part1, problems))
 
 
+# Below this many problems, spinning up the pool (~15ms) and pickling the columns costs more
+# than just doing it (~1us per problem). Measured with --bench on a 4-row worksheet.
+PARALLEL_THRESHOLD = 50_000
+
+
+@variant(1, load=load_worksheet)
+def solve_part1_parallel(worksheet: Iterable, max_workers: int | None = None, threshold: int = PARALLEL_THRESHOLD) -> int:
+    """
+    Actually parallel version of part 1: split the problems into contiguous chunks and
+    let a process pool sum those up, so every task has enough work to pay for itself.
+    On free-threaded builds the same chunks go to threads instead, no pickling needed.
+    Small worksheets just run serially.
+    """
+    problems = _parse_input_part1(worksheet)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(problems) < threshold:
+        return _process_chunk_part1(problems)
+
+    # a few chunks per worker so a slow chunk doesn't leave the others idle
+    chunk_size = -(-len(problems) // (max_workers * 4))
+    chunks = [problems[i:i + chunk_size] for i in range(0, len(problems), chunk_size)]
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    executor = ThreadPoolExecutor if _free_threaded() else ProcessPoolExecutor
+    with executor(max_workers=max_workers) as ex:
+        return sum(ex.map(_process_chunk_part1, chunks))
+
+
+def _first(parts):
+    # what _op does for an unknown operator: leave the first operand alone
+    return parts[0]
+
+
+# operator -> reduction over all of a column's operands. New operators go here.
+REDUCTIONS = {
+    '*': math.prod,
+    '+': sum,
+}
+
+# numpy versions of the above (names of the ufuncs); operators not in here use REDUCTIONS.
+NUMPY_REDUCTIONS = {
+    '*': 'multiply',
+    '+': 'add',
+}
+
+
+@variant(1, load=load_worksheet)
+def solve_part1_reduce(worksheet: Iterable, reductions=REDUCTIONS) -> int:
+    """
+    Look at each column's operator once and hand all of its operands to a single
+    math.prod/sum call, instead of going through _op for every single operand.
+    """
+    total = 0
+    for problem in _parse_input_part1(worksheet):
+        total += reductions.get(problem[-1], _first)(problem[:-1])
+    return total
+
+
+@variant(1, load=load_worksheet, enabled=HAVE_NUMPY)
+def solve_part1_numpy(worksheet: Iterable, reductions=NUMPY_REDUCTIONS, fallback=REDUCTIONS) -> int:
+    """
+    All columns with the same operator in one ufunc reduce. Products easily leave int64,
+    so every reduce is done again in float64 as an overflow check; columns that come too
+    close to the limit (and operators numpy doesn't know) are redone with python ints.
+    """
+    import numpy as np
+    rows = [line.split() for line in worksheet]
+    rows = [row for row in rows if row]
+    operators = np.array(rows[-1])
+    try:
+        numbers = np.array(rows[:-1]).astype(np.int64)
+    except (OverflowError, ValueError):
+        # operands that don't even fit into int64
+        return solve_part1_reduce([" ".join(row) for row in rows], fallback)
+
+    total = 0
+    slow = np.zeros(len(operators), dtype=bool)
+    for operator in np.unique(operators):
+        columns = operators == operator
+        ufunc_name = reductions.get(str(operator))
+        if ufunc_name is None:
+            slow |= columns
+            continue
+        ufunc = getattr(np, ufunc_name)
+        selected = numbers[:, columns]
+        estimate = np.abs(ufunc.reduce(selected.astype(np.float64), axis=0))
+        safe = estimate < 2.0**62
+        total += int(ufunc.reduce(selected[:, safe], axis=0).sum(dtype=object))
+        slow[np.flatnonzero(columns)[~safe]] = True
+
+    for col in np.flatnonzero(slow):
+        parts = [int(v) for v in numbers[:, col]]
+        total += fallback.get(str(operators[col]), _first)(parts)
+    return total
+
+
+def _process_chunk_part1(problems):
+    return sum(map(_process_problem_part1, problems))
+
+
+def _free_threaded():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
 def _process_problem_part1(problem):
     operator = problem[-1]
     result = problem[0]
@@ -37,6 +163,35 @@ def _process_problem_part1(problem):
     return result
 
 
+@variant(1)  # takes the path, so this one is timed including reading the file
+def solve_part1_streaming(path) -> int:
+    """
+    Part 1 without ever holding the worksheet: grab the operator row from the end of the
+    mapped file first, then go through the number rows and fold each value into one running
+    result per column. Memory is O(columns) plus the line index, instead of several copies
+    of every cell.
+    """
+    worksheet = MappedInput(path)
+    # the line index lets us jump straight to the operator row at the end
+    last = len(worksheet) - 1
+    while last >= 0 and not worksheet.line(last):
+        last -= 1
+    if last < 0:
+        return 0
+    operators = worksheet.line(last).tobytes().decode().split()
+    results = None
+    for row in range(last):
+        tokens = worksheet.line(row).tobytes().split()
+        if not tokens or not tokens[0].isdigit():
+            continue  # blank
+        if results is None:
+            results = [int(t) for t in tokens]
+            continue
+        for i, t in enumerate(tokens):
+            results[i] = _op(operators[i], results[i], int(t))
+    return sum(results) if results else 0
+
+
 def _parse_input_part1(sheet): 
     t = [line.strip().split() for line in sheet]
     return [[int(s) if isinstance(x, str) and (s := x.strip()).isdigit() else x for x in list(col)] for col in zip(*t)]
@@ -53,6 +208,7 @@ def _op(operator, current, add):
 
 
 def main():
+    import argparse
     parser = argparse.ArgumentParser(
         description="AoC Day 5: Cafeteria"
     )
@@ -66,26 +222,32 @@ def main():
         help="Benchmark the stuﬀ",
         action="store_true",
     )
+    parser.add_argument(
+        "--streaming",
+        help="Solve while reading the file, without keeping the worksheet around.",
+        action="store_true",
+    )
     args = parser.parse_args()
 
     path = 'input.txt'
     if args.test:
         path = 'test.txt'
-    with open(path, 'rt') as file:
-        input = [line for line in file]
+
+    if args.streaming and not args.bench:
+        print(f'solution 1: {solve_part1_streaming(path)}')
+        return
+
+    input = load_worksheet(path)
 
     if args.bench:
         print("Benchmarking...")
-        p1 = bench.bench_func(solve_part1, input, repeat=20)
-        bench.print_stats(p1)
-        print()
-        p1_mt = bench.bench_func(solve_part1_mt, input, repeat=20)
-        bench.print_stats(p1_mt)
-        print()
-        bench.print_comparison(p1, p1_mt)
+        import bench
+        bench.run_variants(sys.modules[__name__], path)
+        # threshold=0: we want to see the pool, even if the input is small
+        bench.run_worker_scaling(solve_part1_parallel, input, keyword="max_workers", repeat=10, threshold=0)
 
 
-    sol1 = solve_part1(input)
+    sol1 = solve_part1_parallel(input)
     print(f'solution 1: {sol1}')
 
 
@@ -0,0 +1,161 @@
+"""
+Solve a whole pile of inputs for one day without starting python for every single file.
+
+    python batch.py 2025/day4 inputs/day4/ 'more/*.txt' --workers 8 > results.jsonl
+
+The day is imported once per worker process, files are handed out in chunks, and every
+result is written as one JSON line (file, answers, seconds) as soon as its chunk is done,
+so with several workers the lines come out in completion order, not input order.
+Which function solves a part comes from the day's @variant(..., solver=True).
+Answers for inputs (and solutions) we've seen before come from the cache (see cache.py).
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+import cache
+import variants
+
+# set per worker by _init_worker
+_solvers: Dict[int, Any] = {}
+
+
+def collect_inputs(patterns: List[str]) -> List[str]:
+    """Expand directories (every file in them) and globs into a sorted list of files."""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.extend(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            files.extend(glob.glob(pattern))
+    return sorted(f for f in set(files) if os.path.isfile(f))
+
+
+def resolve_solvers(module, parts=None, names=None) -> Dict[int, Any]:
+    """part -> solver function, the day's solver=True variants unless names says otherwise."""
+    all_parts = sorted({f.bench_variant["part"] for f in variants.find_variants(module)})
+    solvers = {}
+    for part in parts or all_parts:
+        func = variants.find_solver(module, part)
+        for name in names or ():
+            matches = [f for f in variants.find_variants(module, part) if f.__name__ == name]
+            if matches:
+                func = matches[0]
+        if func is None:
+            raise ValueError(f"{module.__name__} has nothing for part {part}")
+        solvers[part] = func
+    return solvers
+
+
+def solve_file(path: str, solvers=None) -> Dict[str, Any]:
+    """Run every solver on one input; errors end up in the record instead of killing the batch."""
+    if solvers is None:
+        solvers = _solvers
+    record: Dict[str, Any] = {"file": path}
+    start = time.perf_counter()
+    try:
+        for part, func in solvers.items():
+            info = func.bench_variant
+            t0 = time.perf_counter()
+            # loading is part of the work a cache hit saves us
+            result, hit = cache.result(func, path, lambda: variants.answer(func(info["load"](path) if info["load"] else path)))
+            record[f"part{part}"] = result
+            record[f"part{part}_seconds"] = time.perf_counter() - t0
+            record[f"part{part}_cached"] = hit
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+def run_batch(day_dir, files, parts=None, names=None, workers=None, chunksize=None, out=sys.stdout):
+    """
+    Solve files in a process pool, streaming JSONL to out in the order chunks finish.
+    Returns (files, failed, elapsed seconds).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunksize is None:
+        # big enough to keep the pickling overhead down, small enough to keep everyone busy
+        chunksize = max(1, len(files) // (workers * 4))
+
+    start = time.perf_counter()
+    failed = 0
+    # also in the parent, so a bad day/part/variant fails here and not in every worker
+    _init_worker(day_dir, parts, names)
+    if workers <= 1:
+        batches = ([solve_file(path)] for path in files)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(day_dir, parts, names),
+        )
+        futures = [executor.submit(_solve_chunk, files[i:i + chunksize]) for i in range(0, len(files), chunksize)]
+        # whichever chunk is done first, not in input order: one slow file shouldn't hold up the rest
+        batches = (future.result() for future in as_completed(futures))
+    try:
+        for records in batches:
+            for record in records:
+                if "error" in record:
+                    failed += 1
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return len(files), failed, time.perf_counter() - start
+
+
+def _solve_chunk(paths):
+    return [solve_file(path) for path in paths]
+
+
+def _init_worker(day_dir, parts, names):
+    global _solvers
+    module = variants.load_day(day_dir)
+    _solvers = resolve_solvers(module, parts, names)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Solve many inputs for one day in parallel")
+    parser.add_argument("day", help="solution directory, e.g. 2025/day4")
+    parser.add_argument("inputs", nargs="+", help="input files, directories or glob patterns")
+    parser.add_argument("--part", type=int, action="append", help="only solve this part (repeatable)")
+    parser.add_argument("--variant", action="append", help="use this variant instead of the default solver")
+    parser.add_argument("--workers", type=int, help="worker processes (default: cpu count)")
+    parser.add_argument("--chunksize", type=int, help="files per work item (default: from the batch size)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="solve everything again instead of reusing cached answers")
+    parser.add_argument("-o", "--output", help="write the JSONL here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.no_cache:
+        # in the environment, so the worker processes see it as well
+        os.environ["AOC_CACHE"] = ""
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        parser.error("no input files found")
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        count, failed, elapsed = run_batch(
+            args.day, files, parts=args.part, names=args.variant,
+            workers=args.workers, chunksize=args.chunksize, out=out,
+        )
+    finally:
+        if args.output:
+            out.close()
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{count} files ({failed} failed) in {elapsed:.3f}s: {rate:.1f} files/s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,60 +1,161 @@
+import cProfile
+import csv
+import datetime
 import functools
+import gc
+import hashlib
 import inspect
+import json
 import math
+import os
+import pickle
+import platform
+import pstats
+import random
 import statistics
+import subprocess
+import sys
+import tempfile
+import time
 import timeit
+import tracemalloc
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
-def bench_func(func, arg, repeat=10):
-    # create a callable wrapper for timeit
-    wrapper = lambda: func(arg)
-    timer = timeit.Timer(wrapper)
-    number, _ = timer.autorange()  # determine a reasonable loop count
-    raw = timer.repeat(repeat=repeat, number=number)
-    per_iter = [t / number for t in raw]
+import cache
+from variants import answer, find_generator, find_variants, load_day
+
+# where bench_func appends its results; set BENCH_STORE to move it, or to "" to turn it off.
+DEFAULT_STORE = os.environ.get(
+    "BENCH_STORE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results.jsonl")
+)
+
+def _uncached(measure):
+    """Run a measuring function with the result/table cache off: timing cache hits tells us nothing."""
+    @functools.wraps(measure)
+    def wrapper(*args, **kwargs):
+        with cache.disabled():
+            return measure(*args, **kwargs)
+    return wrapper
+
+@_uncached
+def bench_func(func, arg, repeat=10, store=DEFAULT_STORE, name=None, setup=None,
+               warmup=1, disable_gc=True, trim_outliers=True):
+    """
+    Time func(arg). If setup is given, every call gets func(setup(arg)) instead, and only
+    the call itself is timed (perf_counter_ns around each call), e.g. to hand in-place
+    solvers a fresh copy of their input without measuring the copy.
+    Measurements outside 1.5 IQR of the quartiles are dropped before mean/std_dev;
+    the percentiles are over all of them.
+    """
+    for _ in range(warmup):
+        func(setup(arg) if setup else arg)
+
+    if setup is None:
+        # create a callable wrapper for timeit
+        wrapper = lambda: func(arg)
+        timer = timeit.Timer(wrapper)
+        number, _ = timer.autorange()  # determine a reasonable loop count
+        # timeit turns off the gc by itself; turn it back on if we're asked to keep it
+        if not disable_gc:
+            timer = timeit.Timer(wrapper, setup="gc.enable()", globals={"gc": gc})
+        raw = timer.repeat(repeat=repeat, number=number)
+    else:
+        number = _autorange_with_setup(func, setup, arg)
+        raw = [_time_with_setup(func, setup, arg, number, disable_gc) for _ in range(repeat)]
+    all_per_iter = [t / number for t in raw]
+    per_iter = _trim_outliers(all_per_iter) if trim_outliers else all_per_iter
 
     mean = statistics.mean(per_iter)
     stdev = statistics.stdev(per_iter) if len(per_iter) > 1 else 0.0
-    minimum = min(per_iter)
-    maximum = max(per_iter)
+    minimum = min(all_per_iter)
+    maximum = max(all_per_iter)
+    p50, p90, p99 = _percentiles(all_per_iter, (50, 90, 99))
 
     underlying = _unwrap_callable(func)
-    func_name = getattr(underlying, "__name__", None)
+    func_name = name or getattr(underlying, "__name__", None)
     if not func_name:
         func_name = repr(underlying)
 
-    return {
+    result = {
         "func": func_name,
+        "module": _func_module(underlying),
         "number": number,
         "repeat": repeat,
         "mean": mean,
         "std_dev": stdev,
         "min": minimum,
         "max": maximum,
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "outliers": len(all_per_iter) - len(per_iter),
         "per_iter": per_iter,
     }
+    if store:
+        record_result(result, arg, store)
+    return result
 
-def print_stats(r: Dict[str, Any]) -> None:
-    def _choose_unit(sec):
-        if sec is None:
-            sec = 0.0
-        s = abs(sec)
-        units = [
-            ("h", 3600.0),
-            ("m", 60.0),
-            ("s", 1.0),
-            ("ms", 1e-3),
-            ("us", 1e-6),
-            ("ns", 1e-9),
-        ]
-        for name, thresh in units:
-            if s >= thresh:
-                return name, thresh
-        # extremely small: use ns
-        return "ns", 1e-9
+def _time_with_setup(func, setup, arg, number, disable_gc=True):
+    """Total time of number calls of func(setup(arg)), not counting setup."""
+    total = 0
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        for _ in range(number):
+            x = setup(arg)
+            t0 = time.perf_counter_ns()
+            func(x)
+            total += time.perf_counter_ns() - t0
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return total / 1e9
+
+def _autorange_with_setup(func, setup, arg, min_time=0.2):
+    # same idea as timeit.Timer.autorange: 1, 2, 5, 10, 20, 50, ... until it takes long enough
+    i = 1
+    while True:
+        for j in (1, 2, 5):
+            number = i * j
+            if _time_with_setup(func, setup, arg, number) >= min_time:
+                return number
+        i *= 10
+
+def _trim_outliers(values):
+    if len(values) < 4:
+        return list(values)
+    q1, _, q3 = statistics.quantiles(values, n=4)
+    fence = 1.5 * (q3 - q1)
+    kept = [v for v in values if q1 - fence <= v <= q3 + fence]
+    return kept if len(kept) >= 2 else list(values)
+
+def _percentiles(values, pcts):
+    if len(values) < 2:
+        return tuple(values[0] for _ in pcts)
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return tuple(cuts[p - 1] if p < 100 else max(values) for p in pcts)
 
+def _choose_unit(sec):
+    if sec is None:
+        sec = 0.0
+    s = abs(sec)
+    units = [
+        ("h", 3600.0),
+        ("m", 60.0),
+        ("s", 1.0),
+        ("ms", 1e-3),
+        ("us", 1e-6),
+        ("ns", 1e-9),
+    ]
+    for name, thresh in units:
+        if s >= thresh:
+            return name, thresh
+    # extremely small: use ns
+    return "ns", 1e-9
 
+def print_stats(r: Dict[str, Any]) -> None:
     mean = r["mean"]
     unit, factor = _choose_unit(mean)
     def fmt(val):
@@ -68,7 +169,302 @@ def print_stats(r: Dict[str, Any]) -> None:
     print(f"  std_dev ({unit})      : {fmt(r['std_dev'])}")
     print(f"  min ({unit})          : {fmt(r['min'])}")
     print(f"  max ({unit})          : {fmt(r['max'])}")
+    if "p50" in r:
+        print(f"  p50 ({unit})          : {fmt(r['p50'])}")
+        print(f"  p90 ({unit})          : {fmt(r['p90'])}")
+        print(f"  p99 ({unit})          : {fmt(r['p99'])}")
+        print(f"  outliers dropped      : {r['outliers']}")
+
+
+# --- memory ---
+@_uncached
+def bench_memory(func, arg, repeat=5, setup=None, name=None, top=5):
+    """
+    Memory companion to bench_func: run func(arg) (or func(setup(arg)), setup not counted)
+    under tracemalloc and report the peak traced memory per call, how many blocks are
+    still allocated when it returns (its result included), and the top allocation sites
+    of those blocks (from the first run).
+    """
+    peaks = []
+    blocks = []
+    sites = []
+    for i in range(repeat):
+        x = setup(arg) if setup else arg
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot() if i == 0 else None
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            result = func(x)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        peaks.append(peak - base)
+        diff = after.filter_traces(_MEMORY_FILTERS)
+        if before is not None:
+            stats = diff.compare_to(before.filter_traces(_MEMORY_FILTERS), "lineno")
+            stats = [st for st in stats if st.size_diff > 0]
+            blocks.append(sum(st.count_diff for st in stats))
+            sites = [
+                (f"{_short_path(st.traceback[0].filename)}:{st.traceback[0].lineno}", st.size_diff, st.count_diff)
+                for st in stats[:top]
+            ]
+        del result
+
+    underlying = _unwrap_callable(func)
+    return {
+        "func": name or getattr(underlying, "__name__", None) or repr(underlying),
+        "repeat": repeat,
+        "peak": statistics.mean(peaks),
+        "peak_std": statistics.stdev(peaks) if len(peaks) > 1 else 0.0,
+        "per_iter_peak": peaks,
+        "blocks": statistics.mean(blocks) if blocks else 0,
+        "top_sites": sites,
+    }
+
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+def print_memory(m: Dict[str, Any]) -> None:
+    print(f"{m['func']} (memory):")
+    print(f"  measurements (repeat) : {m['repeat']}")
+    print(f"  peak                  : {_fmt_bytes(m['peak'])} (std_dev {_fmt_bytes(m['peak_std'])})")
+    print(f"  blocks left allocated : {m['blocks']:.0f}")
+    if m["top_sites"]:
+        print("  top allocation sites  :")
+        for where, size, count in m["top_sites"]:
+            print(f"    {where}: {_fmt_bytes(size)} in {count} blocks")
 
+def _fmt_bytes(n):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+def _short_path(path):
+    root = os.path.dirname(os.path.abspath(__file__))
+    return os.path.relpath(path, root) if path.startswith(root) else path
+
+# --- profiling ---
+@_uncached
+def profile_func(func, arg, repeat=5, setup=None, out_prefix=None, name=None):
+    """
+    Run func(arg) repeat times under cProfile (setup, if given, runs outside the profiler)
+    and return the aggregated pstats.Stats. With out_prefix, also write <prefix>.pstats and
+    <prefix>.collapsed, the latter in the folded-stack format flamegraph tools read.
+    """
+    stats = None
+    for _ in range(repeat):
+        x = setup(arg) if setup else arg
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            func(x)
+        finally:
+            prof.disable()
+        if stats is None:
+            stats = pstats.Stats(prof)
+        else:
+            stats.add(prof)
+
+    if out_prefix is None:
+        underlying = _unwrap_callable(func)
+        out_prefix = name or getattr(underlying, "__name__", None) or "profile"
+    if out_prefix:
+        stats.dump_stats(out_prefix + ".pstats")
+        with open(out_prefix + ".collapsed", "w") as f:
+            for stack, micros in sorted(_collapse_stacks(stats).items()):
+                if micros > 0:
+                    f.write(f"{stack} {micros}\n")
+    return stats
+
+def print_profile(stats, top=20, module_file=None) -> None:
+    """Top functions by cumulative time; the ones from module_file (the day) get a '*'."""
+    stats.sort_stats("cumulative")
+    entries = [(fn, stats.stats[fn]) for fn in stats.fcn_list[:]]
+    day = os.path.abspath(module_file) if module_file else None
+    print(f"  {'ncalls':>10}  {'tottime':>9}  {'cumtime':>9}  function")
+    shown = 0
+    for fn, (cc, nc, tt, ct, _) in entries:
+        filename, _, funcname = fn
+        # the profiler's own bookkeeping isn't interesting
+        if funcname == "<method 'disable' of '_lsprof.Profiler' objects>":
+            continue
+        mark = "*" if day and os.path.abspath(filename) == day else " "
+        print(f"{mark} {nc:>10}  {tt:>9.4f}  {ct:>9.4f}  {_frame_label(fn)}")
+        shown += 1
+        if shown >= top:
+            break
+
+def _frame_label(fn):
+    filename, lineno, funcname = fn
+    if filename == "~":
+        return funcname  # builtins
+    return f"{_short_path(filename)}:{lineno}({funcname})"
+
+def _collapse_stacks(stats, max_depth=64):
+    """
+    cProfile only knows caller -> callee edges, not whole stacks, so rebuild them from the
+    roots down and split a function's own time over its callers by their share of its
+    cumulative time. Good enough for a flamegraph.
+    """
+    children: Dict[Any, List[Any]] = {}
+    for fn, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, edge_ct) in callers.items():
+            children.setdefault(caller, []).append((fn, edge_ct))
+    roots = [fn for fn, (_, _, _, _, callers) in stats.stats.items()
+             if not any(c in stats.stats for c in callers)]
+
+    folded: Dict[str, int] = {}
+    def walk(fn, path, fraction):
+        _, _, tt, ct, _ = stats.stats[fn]
+        path = path + [_frame_label(fn).replace(";", ":").replace(" ", "_")]
+        key = ";".join(path)
+        folded[key] = folded.get(key, 0) + int(tt * fraction * 1e6)
+        if len(path) >= max_depth:
+            return
+        for child, edge_ct in children.get(fn, ()):
+            child_ct = stats.stats[child][3]
+            if child_ct <= 0 or _frame_label(child).replace(";", ":").replace(" ", "_") in path:
+                continue  # recursion; its time is already in there
+            walk(child, path, fraction * edge_ct / child_ct)
+    for root in roots:
+        walk(root, [], 1.0)
+    return folded
+
+# --- results store ---
+def record_result(r: Dict[str, Any], arg=None, path: str = DEFAULT_STORE) -> Dict[str, Any]:
+    """Append a bench_func result plus some context (python, input, commit, time) to a JSONL file."""
+    record = {
+        "func": r["func"],
+        "module": r.get("module"),
+        "number": r["number"],
+        "repeat": r["repeat"],
+        "mean": r["mean"],
+        "std_dev": r["std_dev"],
+        "p50": r.get("p50"),
+        "p90": r.get("p90"),
+        "p99": r.get("p99"),
+        "per_iter": r["per_iter"],
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "input_hash": _input_hash(arg),
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+def load_results(path: str = DEFAULT_STORE, func: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All stored records (oldest first), optionally only the ones for func."""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if func is None or record["func"] == func:
+                records.append(record)
+    return records
+
+def export_results(records: List[Dict[str, Any]], out, fmt: str = "csv") -> None:
+    """Write records to the file object out, as CSV (one row per record, no per_iter) or JSON."""
+    if fmt == "json":
+        json.dump(records, out, indent=2)
+        out.write("\n")
+        return
+    fields = ["timestamp", "func", "module", "mean", "std_dev", "p50", "p90", "p99", "number", "repeat",
+              "python", "implementation", "input_hash", "commit"]
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+
+def compare_to_baseline(current: Dict[str, Any], history: List[Dict[str, Any]], alpha: float = 0.05) -> Dict[str, Any]:
+    """
+    Compare a record against earlier runs of the same function (and day) on the same input.
+    All earlier measurements are pooled into one baseline; a slowdown is flagged if the
+    current mean is higher and Welch's t-test says that's not just noise.
+    """
+    baseline = [
+        t for h in history
+        if _history_key(h) == _history_key(current)
+        for t in h["per_iter"]
+    ]
+    cur = current["per_iter"]
+    if len(baseline) < 2 or len(cur) < 2:
+        return {"func": current["func"], "baseline_n": len(baseline), "regression": False, "p_value": None}
+
+    mean_a, mean_b = statistics.mean(baseline), statistics.mean(cur)
+    s_a, s_b = statistics.stdev(baseline), statistics.stdev(cur)
+    t_stat, df = _welch_t_and_df(mean_a, mean_b, s_a, s_b, len(baseline), len(cur))
+    p_value, p_method = _p_value_from_t(t_stat, df)
+    return {
+        "func": current["func"],
+        "baseline_n": len(baseline),
+        "baseline_mean": mean_a,
+        "mean": mean_b,
+        "ratio": mean_b / mean_a if mean_a else float("inf"),
+        "p_value": p_value,
+        "p_method": p_method,
+        "regression": mean_b > mean_a and p_value < alpha,
+    }
+
+def print_baseline_report(reports: List[Dict[str, Any]]) -> None:
+    print("Comparison against stored history:")
+    for rep in reports:
+        if rep["p_value"] is None:
+            print(f"  {rep['func']}: not enough history ({rep['baseline_n']} measurements)")
+            continue
+        verdict = "REGRESSION" if rep["regression"] else "ok"
+        print(f"  {rep['func']}: {rep['ratio']:.3f}x baseline (n={rep['baseline_n']}), "
+              f"p={rep['p_value']:.3g} [{rep['p_method']}] -> {verdict}")
+
+def _history_key(record):
+    # several days have e.g. a part1_numpy, so the name alone isn't enough
+    return record.get("module"), record["func"], record.get("input_hash")
+
+def _func_module(func):
+    # path of the day the function lives in, relative to the repo
+    try:
+        path = inspect.getfile(func)
+    except TypeError:
+        return None
+    return os.path.relpath(path, os.path.dirname(os.path.abspath(__file__)))
+
+def _input_hash(arg):
+    if arg is None:
+        return None
+    if isinstance(arg, str):
+        data = arg.encode()
+    elif isinstance(arg, (bytes, bytearray, memoryview)):
+        data = bytes(arg)
+    else:
+        try:
+            data = pickle.dumps(arg, protocol=4)
+        except Exception:
+            data = repr(arg).encode()
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
 
 # --- helpers ---
 def _unwrap_callable(obj):
@@ -178,11 +574,13 @@ def _p_value_from_t(t_stat, df):
         method = "normal-approx"
         return p, method
 
-def print_comparison(a: Dict[str, Any], b: Dict[str, Any]) -> None:
+def print_comparison(a: Dict[str, Any], b: Dict[str, Any],
+                     mem_a: Optional[Dict[str, Any]] = None, mem_b: Optional[Dict[str, Any]] = None) -> None:
     """
     Compare a (baseline) to b (other). Show absolute and relative differences,
     but also use the standard deviations to compute Welch's t, df, p-value,
     and Cohen's d (effect size).
+    With the bench_memory results for both, the peak memory gets the same treatment.
     """
     mean_a = a["mean"]
     mean_b = b["mean"]
@@ -229,3 +627,353 @@ def print_comparison(a: Dict[str, Any], b: Dict[str, Any]) -> None:
     print(f"  significant?        : {significant}")
     print(f"  conclusion          : {faster_note}")
     print()
+    if mem_a is not None and mem_b is not None:
+        _print_memory_comparison(mem_a, mem_b, alpha)
+
+def _print_memory_comparison(a, b, alpha):
+    peak_a, peak_b = a["peak"], b["peak"]
+    if peak_a == peak_b:
+        # allocations are often exactly the same every run; no variance, nothing to test
+        p_value, p_method = 1.0, "identical"
+    else:
+        t_stat, df = _welch_t_and_df(peak_a, peak_b, a["peak_std"], b["peak_std"],
+                                     len(a["per_iter_peak"]), len(b["per_iter_peak"]))
+        p_value, p_method = _p_value_from_t(t_stat, df)
+    smaller = a["func"] if peak_a < peak_b else b["func"]
+    print("Memory comparison (peak traced, baseline -> other):")
+    print(f"  peak baseline       : {_fmt_bytes(peak_a)}")
+    print(f"  peak other          : {_fmt_bytes(peak_b)}")
+    print(f"  peak diff           : {'+' if peak_b >= peak_a else '-'}{_fmt_bytes(abs(peak_b - peak_a))}")
+    print(f"  ratio               : {(peak_b / peak_a) if peak_a else float('inf'):.3f} x")
+    print(f"  blocks left (b - a) : {b['blocks'] - a['blocks']:+.0f}")
+    print(f"  p-value (two-sided) : {p_value:.6g}  [method: {p_method}]")
+    print(f"  significant?        : {p_value < alpha}")
+    print(f"  conclusion          : {smaller + ' uses less' if peak_a != peak_b else 'same peak'}")
+    print()
+
+# --- variants ---
+# (the decorators and lookups live in variants.py, so solutions can use them without importing all of this)
+def run_variants(module, path, part=None, repeat=20, only=None, memory=False):
+    """
+    Benchmark every variant of module (or just part) on the input at path and print one
+    comparison table per part. Each variant loads the input on its own, so nothing one
+    variant does to its input can leak into the next.
+    """
+    by_part: Dict[int, List[Dict[str, Any]]] = {}
+    for func in find_variants(module, part):
+        if only and func.__name__ not in only:
+            continue
+        info = func.bench_variant
+        data = info["load"](path) if info["load"] else path
+        fresh = info["fresh"]
+        # fresh copies are made outside of the timed part
+        r = bench_func(func, data, repeat=repeat, name=func.__name__, setup=fresh)
+        r["answer"] = answer(func(fresh(data) if fresh else data))
+        if memory:
+            r["memory"] = bench_memory(func, data, setup=fresh, name=func.__name__)
+        by_part.setdefault(info["part"], []).append(r)
+
+    for p, results in sorted(by_part.items()):
+        print(f"Part {p}:")
+        print_table(results)
+        print()
+        if memory:
+            print(f"Part {p} memory:")
+            print_memory_table(results)
+            print()
+    return by_part
+
+def print_table(results: List[Dict[str, Any]], alpha: float = 0.05) -> None:
+    """N-way version of print_comparison: everything relative to the fastest variant."""
+    fastest = min(results, key=lambda r: r["mean"])
+    unit, factor = _choose_unit(fastest["mean"])
+    width = max(len(r["func"]) for r in results)
+    print(f"  {'variant':<{width}}  {'mean (' + unit + ')':>12}  {'std_dev':>10}  {'p50':>10}  {'p90':>10}  "
+          f"{'ratio':>8}  {'p-value':>9}  answer")
+    for r in sorted(results, key=lambda r: r["mean"]):
+        if r is fastest:
+            ratio, p_col = "baseline", ""
+        else:
+            t_stat, df = _welch_t_and_df(
+                fastest["mean"], r["mean"], fastest["std_dev"], r["std_dev"],
+                len(fastest["per_iter"]), len(r["per_iter"]),
+            )
+            p_value, _ = _p_value_from_t(t_stat, df)
+            ratio = f"{r['mean'] / fastest['mean']:.3f}x" if fastest["mean"] else "inf"
+            p_col = f"{p_value:.3g}" + ("" if p_value < alpha else "*")
+        print(f"  {r['func']:<{width}}  {r['mean'] / factor:>12.3f}  {r['std_dev'] / factor:>10.3f}  "
+              f"{r['p50'] / factor:>10.3f}  {r['p90'] / factor:>10.3f}  {ratio:>8}  {p_col:>9}  {r.get('answer')}")
+    answers = {repr(r.get("answer")) for r in results}
+    if len(answers) > 1:
+        print("  WARNING: variants disagree on the answer!")
+    print(f"  (* = not significantly different from the fastest at alpha={alpha})")
+
+def print_memory_table(results: List[Dict[str, Any]]) -> None:
+    mems = [r["memory"] for r in results]
+    smallest = min(mems, key=lambda m: m["peak"])
+    width = max(len(m["func"]) for m in mems)
+    print(f"  {'variant':<{width}}  {'peak':>12}  {'ratio':>8}  {'blocks left':>11}  top site")
+    for m in sorted(mems, key=lambda m: m["peak"]):
+        ratio = "baseline" if m is smallest else (f"{m['peak'] / smallest['peak']:.2f}x" if smallest["peak"] else "inf")
+        site = m["top_sites"][0][0] if m["top_sites"] else ""
+        print(f"  {m['func']:<{width}}  {_fmt_bytes(m['peak']):>12}  {ratio:>8}  {m['blocks']:>11.0f}  {site}")
+
+# --- scaling ---
+def run_scaling(module, sizes=None, part=None, repeat=5, seed=0, only=None, max_time=1.0):
+    """
+    Time every variant on generated inputs of growing size and fit t ~ size^k with a
+    log-log regression, so we can see who's linear and who isn't. A variant whose mean
+    goes over max_time seconds is not run on the bigger sizes anymore.
+    Returns a list of rows (part, func, size, mean, std_dev).
+    """
+    gen = find_generator(module)
+    if gen is None:
+        raise ValueError(f"{module.__name__} has no @variants.generator")
+    if sizes is None:
+        sizes = gen.bench_generator["sizes"]
+    variants = [f for f in find_variants(module, part) if not only or f.__name__ in only]
+
+    rows = []
+    too_slow = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"input_{size}.txt")
+            with open(path, "w") as f:
+                f.write(gen(size, random.Random(seed)))
+            for func in variants:
+                if func in too_slow:
+                    continue
+                info = func.bench_variant
+                data = info["load"](path) if info["load"] else path
+                r = bench_func(func, data, repeat=repeat, store=None, name=func.__name__, setup=info["fresh"])
+                rows.append({"part": info["part"], "func": func.__name__, "size": size,
+                             "mean": r["mean"], "std_dev": r["std_dev"]})
+                if r["mean"] > max_time:
+                    too_slow.add(func)
+    return rows
+
+def fit_exponent(sizes, means):
+    """Slope of log(time) over log(size): ~1 is linear, ~2 quadratic, ~0 doesn't care."""
+    if len(sizes) < 2:
+        return float("nan")
+    slope, _ = statistics.linear_regression([math.log(n) for n in sizes], [math.log(t) for t in means])
+    return slope
+
+def print_scaling(rows) -> None:
+    sizes = sorted({r["size"] for r in rows})
+    for part in sorted({r["part"] for r in rows}):
+        print(f"Part {part} (mean time per call):")
+        funcs = list(dict.fromkeys(r["func"] for r in rows if r["part"] == part))
+        width = max(len(f) for f in funcs)
+        print(f"  {'variant':<{width}}" + "".join(f"  {n:>10}" for n in sizes) + "  exponent")
+        for func in funcs:
+            by_size = {r["size"]: r["mean"] for r in rows if r["part"] == part and r["func"] == func}
+            cells = []
+            for n in sizes:
+                if n in by_size:
+                    unit, factor = _choose_unit(by_size[n])
+                    cells.append(f"{by_size[n] / factor:.1f}{unit}")
+                else:
+                    cells.append("-")
+            k = fit_exponent(list(by_size), list(by_size.values()))
+            print(f"  {func:<{width}}" + "".join(f"  {c:>10}" for c in cells) + f"  {k:8.2f}")
+        print()
+
+def write_scaling_csv(rows, out) -> None:
+    writer = csv.DictWriter(out, fieldnames=["part", "func", "size", "mean", "std_dev"])
+    writer.writeheader()
+    writer.writerows(rows)
+
+def worker_counts(max_workers=None):
+    """1, 2, 4, ... up to max_workers (default: the cpu count), with max_workers itself last."""
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= max_workers:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != max_workers:
+        workers.append(max_workers)
+    return workers
+
+def run_worker_scaling(func, arg, workers=None, keyword="workers", repeat=5, **kwargs):
+    """
+    Time func(arg, <keyword>=w, **kwargs) for every worker count w (default: worker_counts())
+    and print speedup and parallel efficiency against the first one. Returns (w, result) pairs.
+    """
+    name = getattr(func, "__name__", repr(func))
+    rows = []
+    for w in workers or worker_counts():
+        call = functools.partial(func, **{keyword: w}, **kwargs)
+        rows.append((w, bench_func(call, arg, repeat=repeat, name=f"{name}[{w}]")))
+    print_worker_scaling(name, rows)
+    return rows
+
+def print_worker_scaling(name, rows) -> None:
+    base_workers, base = rows[0][0], rows[0][1]["mean"]
+    print(f"Scaling ({name}):")
+    print(f"  {'workers':>7}  {'mean (ms)':>12}  {'speedup':>8}  {'efficiency':>10}")
+    for w, r in rows:
+        speedup = base / r["mean"] if r["mean"] else float("inf")
+        print(f"  {w:>7}  {r['mean'] * 1e3:>12.3f}  {speedup:>7.2f}x  {speedup * base_workers / w:>9.1%}")
+    print()
+
+def measure_import_time(day_dir, repeat=10, top=10) -> Dict[str, Any]:
+    """
+    How long importing a day takes, i.e. what every `python dayN.py` pays before solving anything.
+    Starts a fresh interpreter per run (anything else would find the modules already imported)
+    and compares against one that imports nothing; the difference is the import.
+    The slowest modules come from -X importtime of one extra run, minus what plain startup imports too.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    day_dir = os.path.abspath(day_dir)
+    name = os.path.basename(os.path.normpath(day_dir))
+    code = f"import sys; sys.path[:0] = [{root!r}, {day_dir!r}]; import {name}"
+
+    def wall(args):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], check=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    def importtime(args):
+        err = subprocess.run([sys.executable, "-X", "importtime", *args],
+                             check=True, capture_output=True, text=True).stderr
+        modules = {}
+        for line in err.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, module = line[len("import time:"):].split("|")
+            modules[module.strip()] = (int(own) * 1e-6, int(cumulative) * 1e-6, len(module) - len(module.lstrip()))
+        return modules
+
+    baseline = wall(["-c", "pass"])
+    total = wall(["-c", code])
+    startup = importtime(["-c", "pass"])
+    modules = importtime(["-c", code])
+    slowest = sorted(((m, own, cum, depth) for m, (own, cum, depth) in modules.items() if m not in startup),
+                     key=lambda x: -x[1])[:top]
+    return {
+        "day": name,
+        "startup": baseline,
+        "total": total,
+        "import": total - baseline,
+        "self_import": modules.get(name, (0, 0, 0))[1],
+        "slowest": slowest,
+    }
+
+def print_import_time(r: Dict[str, Any]) -> None:
+    print(f"{r['day']}: {r['total'] * 1e3:.1f}ms for `import {r['day']}`, "
+          f"{r['startup'] * 1e3:.1f}ms for `pass` -> {r['import'] * 1e3:.1f}ms importing "
+          f"({r['self_import'] * 1e3:.1f}ms by -X importtime)")
+    print(f"  {'self (ms)':>9}  {'cumul (ms)':>10}  module")
+    for module, own, cumulative, depth in r["slowest"]:
+        print(f"  {own * 1e3:>9.2f}  {cumulative * 1e3:>10.2f}  {' ' * (depth - 1)}{module}")
+
+_STORE_COMMANDS = ("compare-to-baseline", "export")
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _STORE_COMMANDS:
+        return _store_main(argv)
+    return _run_main(argv)
+
+def _run_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Benchmark all registered variants of a day",
+        epilog=f"see also: {', '.join(_STORE_COMMANDS)} (for the results store)",
+    )
+    parser.add_argument("day", help="solution directory, e.g. 2025/day4")
+    parser.add_argument("--part", type=int, help="only run this part")
+    parser.add_argument("--input", help="input file (default: input.txt in the day directory)")
+    parser.add_argument("--test", action="store_true", help="use test.txt instead of input.txt")
+    parser.add_argument("--repeat", type=int, help="measurements per variant (default: 20, or 5 with --scaling)")
+    parser.add_argument("--only", nargs="+", metavar="VARIANT", help="only run these variants")
+    parser.add_argument("--memory", action="store_true",
+                        help="also measure peak memory and allocation sites (tracemalloc)")
+    parser.add_argument("--profile", metavar="VARIANT", help="run this variant under cProfile instead")
+    parser.add_argument("--profile-out", metavar="PREFIX",
+                        help="--profile: where to write <PREFIX>.pstats/.collapsed (default: the variant's name)")
+    parser.add_argument("--top", type=int, default=20, help="--profile: how many functions to list")
+    parser.add_argument("--scaling", action="store_true",
+                        help="time the variants on generated inputs of growing size instead")
+    parser.add_argument("--sizes", type=int, nargs="+", help="input sizes for --scaling (default: the day's own)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the --scaling input generator")
+    parser.add_argument("--max-time", type=float, default=1.0,
+                        help="--scaling: stop growing a variant once a call takes longer than this (s)")
+    parser.add_argument("--csv", help="--scaling: also write the measurements to this CSV file")
+    parser.add_argument("--import-time", action="store_true",
+                        help="measure how long importing the day takes (fresh interpreters, -X importtime)")
+    args = parser.parse_args(argv)
+
+    if args.import_time:
+        print_import_time(measure_import_time(args.day, repeat=args.repeat or 10, top=args.top))
+        return 0
+
+    # make the days' own `import bench` find this module instead of loading a second copy
+    sys.modules.setdefault("bench", sys.modules[__name__])
+    module = load_day(args.day)
+    path = args.input or os.path.join(args.day, "test.txt" if args.test else "input.txt")
+    if args.profile:
+        matches = [f for f in find_variants(module, args.part) if f.__name__ == args.profile]
+        if not matches:
+            parser.error(f"no variant {args.profile!r} in {args.day}")
+        func = matches[0]
+        info = func.bench_variant
+        data = info["load"](path) if info["load"] else path
+        stats = profile_func(func, data, repeat=args.repeat or 5, setup=info["fresh"], out_prefix=args.profile_out)
+        prefix = args.profile_out or func.__name__
+        print(f"{func.__name__}: {stats.total_calls} calls in {stats.total_tt:.3f}s over {args.repeat or 5} runs "
+              f"(wrote {prefix}.pstats, {prefix}.collapsed)")
+        print_profile(stats, top=args.top, module_file=module.__file__)
+        return 0
+    if args.scaling:
+        rows = run_scaling(module, args.sizes, part=args.part, repeat=args.repeat or 5,
+                           seed=args.seed, only=args.only, max_time=args.max_time)
+        print_scaling(rows)
+        if args.csv:
+            with open(args.csv, "w", newline="") as f:
+                write_scaling_csv(rows, f)
+        return 0
+    run_variants(module, path, part=args.part, repeat=args.repeat or 20, only=args.only, memory=args.memory)
+    return 0
+
+def _store_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark results store")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--store", help="results file to use", default=DEFAULT_STORE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compare = sub.add_parser(
+        "compare-to-baseline",
+        help="check the latest result of each function against everything recorded before it",
+        parents=[common],
+    )
+    compare.add_argument("--func", help="only look at this function")
+    compare.add_argument("--alpha", type=float, default=0.05, help="significance level")
+
+    export = sub.add_parser("export", help="dump the stored results", parents=[common])
+    export.add_argument("--format", choices=["csv", "json"], default="csv")
+    export.add_argument("--func", help="only export this function")
+
+    args = parser.parse_args(argv)
+    records = load_results(args.store, args.func)
+
+    if args.command == "export":
+        export_results(records, sys.stdout, args.format)
+        return 0
+
+    latest = {}
+    for i, record in enumerate(records):
+        latest[_history_key(record)] = i
+    reports = [compare_to_baseline(records[i], records[:i], args.alpha) for i in sorted(latest.values())]
+    print_baseline_report(reports)
+    # non-zero exit so CI can fail on it
+    return 1 if any(rep["regression"] for rep in reports) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Persistent cache for answers and expensive precomputed tables, so rerunning a solver on an
+input it has seen before is just a file read.
+
+Everything is content-addressed: an answer is stored under (function, hash of the source
+file it lives in and the shared loaders, hash of the input file), so editing the solution
+or the input simply misses instead of serving something stale. Tables (sorted int64
+arrays, e.g. day2's candidate IDs) are stored raw and memory-mapped when used; one built
+for a bigger max also serves every smaller one.
+
+The cache lives in .cache/ next to this file; set AOC_CACHE to move it, or to "" to turn
+it off. AOC_CACHE_SIZE (bytes, default 256MiB) caps it, least recently used goes first.
+bench.py bypasses it while timing (see disabled()), cached answers aren't much of a benchmark.
+
+    python cache.py info
+    python cache.py clear
+"""
+import bisect
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import sys
+from array import array
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_SIZE = 256 << 20
+
+# > 0 while inside disabled()
+_bypass = 0
+# path -> ((size, mtime), hash), so we don't hash the same file over and over within a run
+_hashes = {}
+# (root, bytes) as far as this process knows, see _account()
+_size_estimate = None
+_writes_since_count = 0
+_RECOUNT_EVERY = 1000
+_TMP_SUFFIX = ".tmp"
+
+
+def cache_dir():
+    """Where the cache lives right now, or None if it's turned off."""
+    if _bypass:
+        return None
+    return os.environ.get("AOC_CACHE", DEFAULT_DIR) or None
+
+
+@contextlib.contextmanager
+def disabled():
+    """Neither read nor write the cache inside the with block."""
+    global _bypass
+    _bypass += 1
+    try:
+        yield
+    finally:
+        _bypass -= 1
+
+
+def file_hash(path):
+    st = os.stat(path)
+    stamp = (st.st_size, st.st_mtime_ns)
+    known = _hashes.get(path)
+    if known is not None and known[0] == stamp:
+        return known[1]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()[:32]
+    _hashes[path] = (stamp, digest)
+    return digest
+
+
+# shared code every day reads its input/answers through, so a change there can change any answer
+_SHARED_SOURCES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                   for name in ("mapped_input.py", "variants.py")]
+
+
+def source_hash(func):
+    """
+    Hash of the whole file func is defined in (helpers it calls can change the answer too),
+    plus the shared loader modules.
+    """
+    parts = [file_hash(func.__code__.co_filename)]
+    parts.extend(file_hash(path) for path in _SHARED_SOURCES if os.path.exists(path))
+    return hashlib.sha256(":".join(parts).encode()).hexdigest()[:32]
+
+
+def _func_id(func):
+    # the file and not __module__: that's "__main__" when a day runs directly, and
+    # "day2" under run.py/batch.py, for the very same function
+    return f"{os.path.abspath(func.__code__.co_filename)}:{func.__qualname__}"
+
+
+def result(func, path, compute):
+    """
+    The answer of func on the input file at path: from the cache if we've seen this exact
+    input with this exact source before, otherwise compute() and remember it.
+    Returns (answer, hit). Answers that JSON can't represent are just not cached.
+    """
+    root = cache_dir()
+    if root is None:
+        return compute(), False
+    key = hashlib.sha256(
+        f"{_func_id(func)}:{source_hash(func)}:{file_hash(path)}".encode()
+    ).hexdigest()[:32]
+    entry = os.path.join(root, "results", key + ".json")
+    try:
+        with open(entry) as f:
+            answer = json.load(f)["answer"]
+        _touch(entry)
+        return answer, True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    answer = compute()
+    try:
+        data = json.dumps({"func": _func_id(func), "input": path, "answer": answer})
+    except TypeError:
+        return answer, False
+    _store(root, entry, data.encode())
+    return answer, False
+
+
+def table(name, build, max, source=None):
+    """
+    Sorted int64 values <= max, as a memoryview over a memory-mapped file. build(max) makes
+    them (any sorted iterable of ints) when nothing cached covers max yet. source is the
+    function whose file's hash goes into the key (default: build).
+    """
+    root = cache_dir()
+    if root is None:
+        return memoryview(array("q", build(max)))
+    prefix = f"{name}-{source_hash(source or build)}-"
+    tables = os.path.join(root, "tables")
+
+    # the smallest table that goes at least up to max will do
+    best = None
+    with contextlib.suppress(OSError):
+        for entry in os.listdir(tables):
+            if entry.startswith(prefix) and entry.endswith(".q"):
+                built_for = int(entry[len(prefix):-2])
+                if built_for >= max and (best is None or built_for < best[0]):
+                    best = (built_for, os.path.join(tables, entry))
+    if best is not None:
+        try:
+            values = _map_table(best[1])
+            _touch(best[1])
+            return values[:bisect.bisect_right(values, max)]
+        except (OSError, ValueError):
+            pass  # got evicted under us, or got cut short; just build it again
+
+    values = array("q", build(max))
+    _store(root, os.path.join(tables, f"{prefix}{max}.q"), values.tobytes())
+    return memoryview(values)
+
+
+def _map_table(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(array("q"))
+        # stays mapped for as long as anyone holds on to the view
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast("q")
+
+
+def _touch(path):
+    # eviction goes by mtime, atime is too often switched off
+    with contextlib.suppress(OSError):
+        os.utime(path)
+
+
+def _store(root, path, data):
+    """
+    Put data at path. A cache that can't be written (full disk, read-only, racing another
+    process) just means this one isn't cached, so that's swallowed here; the answer we
+    computed is fine either way.
+    """
+    tmp = f"{path}.{os.getpid()}{_TMP_SUFFIX}"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write + rename, so parallel solvers (batch.py) never see half a file
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        _account(root, len(data))
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+
+
+def _account(root, written):
+    """
+    Keep a running estimate of the cache size instead of walking the whole directory after
+    every write (which made big batches quadratic). The estimate starts from one real count
+    per process and only covers our own writes, so it's recounted every so often to catch
+    up with other processes; the actual walk only happens when it says we're over the limit.
+    """
+    global _size_estimate, _writes_since_count
+    limit = int(os.environ.get("AOC_CACHE_SIZE", DEFAULT_SIZE))
+    if _size_estimate is None or _size_estimate[0] != root or _writes_since_count >= _RECOUNT_EVERY:
+        _size_estimate = (root, sum(size for _, size, _ in _entries(root)))
+        _writes_since_count = 0
+    else:
+        _size_estimate = (root, _size_estimate[1] + written)
+        _writes_since_count += 1
+    if _size_estimate[1] > limit:
+        # make some room while we're at it, or a full cache would walk again on every write
+        _size_estimate = (root, evict(root, limit * 9 // 10))
+        _writes_since_count = 0
+
+
+def _entries(root):
+    found = []
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(_TMP_SUFFIX):
+                continue  # someone else's write in progress, not ours to count or delete
+            path = os.path.join(dirpath, name)
+            with contextlib.suppress(OSError):
+                st = os.stat(path)
+                found.append((st.st_mtime, st.st_size, path))
+    return found
+
+
+def evict(root=None, limit=None):
+    """Delete least recently used entries until the cache fits into limit bytes. Returns what's left."""
+    root = root or cache_dir()
+    if root is None:
+        return 0
+    if limit is None:
+        limit = int(os.environ.get("AOC_CACHE_SIZE", DEFAULT_SIZE))
+    entries = _entries(root)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        # fine to delete while mapped elsewhere, the mapping keeps the data around
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        total -= size
+    return total
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Solver result/table cache")
+    parser.add_argument("command", choices=["info", "clear"])
+    args = parser.parse_args(argv)
+
+    root = cache_dir()
+    if root is None:
+        print("cache is turned off (AOC_CACHE is empty)")
+        return 0
+    entries = _entries(root)
+    if args.command == "clear":
+        evict(root, limit=0)
+        print(f"removed {len(entries)} entries from {root}")
+        return 0
+    results = sum(1 for *_, path in entries if path.endswith(".json"))
+    size = sum(size for _, size, _ in entries)
+    print(f"{root}: {results} answers, {len(entries) - results} tables, {size / 1024:.1f}KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Input files without the copies. The file is memory-mapped read-only, and lines and fields
+come out as memoryviews into the mapping (already stripped), so a solver can walk the
+bytes without decoding anything or keeping a second copy of the file around.
+
+    from mapped_input import MappedInput
+    banks = list(MappedInput("input.txt").lines())
+
+The views keep the mapping alive on their own; close() (or the with block) is only for
+unmapping early, and fails while views are still around.
+"""
+import itertools
+import mmap
+import operator
+import os
+from array import array
+
+_WHITESPACE = b" \t\r\n\v\f"
+_BLOCK_SIZE = 1 << 20
+
+
+class MappedInput:
+    """A read-only mapping of path, plus an index of where every line starts."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            # mmap can't map empty files; the mapping stays valid after the file is closed
+            if os.fstat(f.fileno()).st_size:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._mm = None
+        self.data = memoryview(self._mm if self._mm is not None else b"")
+        self._offsets = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.data.release()
+        if self._mm is not None:
+            self._mm.close()
+
+    @property
+    def offsets(self):
+        """array('q') with the start of every line, and the end of the file last. Built on first use."""
+        if self._offsets is None:
+            offsets = array("q", [0])
+            mm = self._mm
+            pos = 0
+            while mm is not None and pos < len(mm):
+                # a block at a time, so split/accumulate do the work in C and only one block
+                # is ever copied out of the mapping
+                end = mm.find(b"\n", pos + _BLOCK_SIZE)
+                end = len(mm) if end == -1 else end + 1
+                pieces = mm[pos:end].split(b"\n")
+                # every piece but the last ends in a newline; the next line starts one after it
+                offsets.extend(map(operator.add, itertools.accumulate(map(len, pieces[:-1])), itertools.count(pos + 1)))
+                if pieces[-1]:
+                    offsets.append(len(mm))  # no newline at the end of the file
+                pos = end
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def line(self, i):
+        """Line i (negative counts from the end) as a stripped memoryview."""
+        offsets = self.offsets
+        if i < 0:
+            i += len(offsets) - 1
+        if not 0 <= i < len(offsets) - 1:
+            raise IndexError("line index out of range")
+        return self._strip(offsets[i], offsets[i + 1])
+
+    def lines(self, skip_empty=False):
+        """Every line as a stripped memoryview, in order."""
+        data = self.data
+        offsets = self.offsets
+        # same as _strip, inlined: this runs once per line
+        for start, end in zip(offsets, itertools.islice(offsets, 1, None)):
+            while end > start and data[end - 1] in _WHITESPACE:
+                end -= 1
+            while start < end and data[start] in _WHITESPACE:
+                start += 1
+            if start < end or not skip_empty:
+                yield data[start:end]
+
+    def fields(self, sep=b","):
+        """The whole file split on sep (e.g. day2's comma separated ranges), stripped, empty ones skipped."""
+        mm = self._mm
+        if mm is None:
+            return
+        start = 0
+        while start <= len(mm):
+            end = mm.find(sep, start)
+            if end == -1:
+                end = len(mm)
+            view = self._strip(start, end)
+            if view:
+                yield view
+            start = end + len(sep)
+
+    def _strip(self, start, end):
+        data = self.data
+        while start < end and data[start] in _WHITESPACE:
+            start += 1
+        while end > start and data[end - 1] in _WHITESPACE:
+            end -= 1
+        return data[start:end]
@@ -0,0 +1,48 @@
+"""
+Run a day from anywhere, without the sys.path hack in every solution.
+
+    python run.py 2025/day4 --test          # same as `cd 2025/day4 && python day4.py --test`
+    python run.py 2025/day4 --bench --memory  # same as `python -m bench 2025/day4 --memory`
+
+Only variants.py is imported up front, so a plain solve doesn't pay for bench (or numpy).
+"""
+import os
+import sys
+
+import variants
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0].startswith("-"):
+        print(f"usage: {os.path.basename(sys.argv[0])} DAY_DIR [--bench [bench args]] [day args]", file=sys.stderr)
+        return 2
+    day_dir, rest = argv[0], argv[1:]
+
+    if "--bench" in rest:
+        rest.remove("--bench")
+        import bench
+        return bench.main([day_dir] + rest)
+
+    module = variants.load_day(day_dir)
+    # the days read input.txt/test.txt from the working directory, so files given on the
+    # command line have to be pinned down before we move there
+    rest = [_absolute(arg) for arg in rest]
+    os.chdir(day_dir)
+    sys.argv = [module.__file__] + rest
+    return module.main()
+
+
+def _absolute(arg):
+    """arg as an absolute path if it names an existing file here (also as --opt=FILE), else unchanged."""
+    if arg.startswith("-"):
+        opt, sep, value = arg.partition("=")
+        if sep and value and os.path.exists(value):
+            return opt + sep + os.path.abspath(value)
+        return arg
+    return os.path.abspath(arg) if os.path.exists(arg) else arg
+
+
+if __name__ == "__main__":
+    sys.exit(main())
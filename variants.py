@@ -0,0 +1,144 @@
+"""
+The cheap half of the benchmarking tools: marking implementation variants and finding them
+again. Solutions import this at startup, so it must stay free of anything slow to import;
+the actual measuring lives in bench.py, which is only loaded when we benchmark.
+"""
+import importlib.machinery
+import os
+import sys
+
+
+def variant(part, load=None, fresh=None, enabled=True, solver=False):
+    """
+    Mark a function as one implementation of part, so the runner can find it.
+    load(path) turns the input file into whatever the function takes (default: the path);
+    fresh(data), if given, hands every call its own copy, for variants that mutate their input.
+    enabled=False hides it, e.g. when an optional dependency is missing.
+    solver=True marks the one to use when we just want the answer (see batch.py).
+    """
+    def decorate(func):
+        func.bench_variant = {"part": part, "load": load, "fresh": fresh, "enabled": enabled, "solver": solver}
+        return func
+    return decorate
+
+
+def generator(sizes):
+    """
+    Mark a function as the day's synthetic input generator for scaling runs.
+    It's called as func(size, rng) with a seeded random.Random and returns the contents of
+    an input file; what size means (moves, ranges, cells, ...) is up to the day.
+    sizes are the defaults the runner goes through.
+    """
+    def decorate(func):
+        func.bench_generator = {"sizes": list(sizes)}
+        return func
+    return decorate
+
+
+def have(module_name):
+    """Whether an optional dependency is installed, without paying for importing it."""
+    # PathFinder instead of importlib.util.find_spec: importlib.util alone costs a few ms
+    return importlib.machinery.PathFinder.find_spec(module_name) is not None
+
+
+# numpy is optional. Importing it takes longer than most of our solves, so we only check
+# that it's there; the numpy engines import it themselves when they actually run.
+HAVE_NUMPY = have("numpy")
+
+
+def find_variants(module, part=None):
+    """All enabled variants in module, by part and then in source order."""
+    found = []
+    for obj in vars(module).values():
+        info = getattr(obj, "bench_variant", None)
+        if info is None or not info["enabled"]:
+            continue
+        if part is not None and info["part"] != part:
+            continue
+        found.append(obj)
+    return sorted(found, key=lambda f: (f.bench_variant["part"], f.__code__.co_firstlineno))
+
+
+def find_solver(module, part):
+    """The variant marked solver=True for part, or else the first one."""
+    variants = find_variants(module, part)
+    for func in variants:
+        if func.bench_variant["solver"]:
+            return func
+    return variants[0] if variants else None
+
+
+def find_generator(module):
+    for obj in vars(module).values():
+        if getattr(obj, "bench_generator", None) is not None:
+            return obj
+    return None
+
+
+def load_day(day_dir):
+    """
+    Import the solution module in day_dir (e.g. 2025/day4 -> 2025/day4/day4.py).
+    It's registered under its own name and day_dir goes on sys.path, same as running it
+    directly would, so its functions pickle and process pools can find them again
+    (in spawn/forkserver children too).
+    """
+    import importlib.util
+    day_dir = os.path.abspath(day_dir)
+    name = os.path.basename(day_dir)
+    if day_dir not in sys.path:
+        sys.path.insert(0, day_dir)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(day_dir, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def check_pools(root=None):
+    """
+    Run the process pool variants of day1 and day6 on a module from load_day with two
+    workers and compare with the serial answers. Anything in there that doesn't pickle
+    shows up here instead of in the middle of a benchmark.
+    """
+    import random
+    import tempfile
+    root = root or os.path.dirname(os.path.abspath(__file__))
+    rng = random.Random(0)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        day1 = load_day(os.path.join(root, "2025", "day1"))
+        path = os.path.join(tmp, "day1.txt")
+        with open(path, "w") as f:
+            f.write(day1.generate_input(5_000, rng))
+        expected = day1.solve(day1.load_instructions(path))
+        # tiny chunks, so there's more than one for the pool to work on
+        got = day1.solve_parallel(path, workers=2, min_chunk_size=1)
+        print(f"day1 solve_parallel: {got} vs {expected}: {'OK' if got == expected else 'MISMATCH'}")
+        ok &= got == expected
+
+        day6 = load_day(os.path.join(root, "2025", "day6"))
+        path = os.path.join(tmp, "day6.txt")
+        with open(path, "w") as f:
+            f.write(day6.generate_input(1_000, rng))
+        worksheet = day6.load_worksheet(path)
+        expected = day6.solve_part1(worksheet)
+        got = day6.solve_part1_parallel(worksheet, max_workers=2, threshold=0)
+        print(f"day6 solve_part1_parallel: {got} vs {expected}: {'OK' if got == expected else 'MISMATCH'}")
+        ok &= got == expected
+    return ok
+
+
+def answer(result):
+    # the part1 grid solvers return (count, grid)
+    if isinstance(result, tuple):
+        return result[0]
+    return result
+
+
+if __name__ == "__main__":
+    # python variants.py: check that loaded days still work with process pools
+    sys.exit(0 if check_pools() else 1)